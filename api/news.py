@@ -1,29 +1,299 @@
 from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from collections import OrderedDict
+import bisect
+import gzip
+import hashlib
 import json
 import os
+import sys
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+import deltas
+from url_canon import item_id
+
+# 读取本地数据文件（Vercel 部署时需要改用外部存储）
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'news.json')
+# 浏览器每次都来验证（有 ETag，没变化只回 304），CDN 缓存 1 分钟并允许过期后先用旧的
+CACHE_CONTROL = 'public, max-age=0, must-revalidate, s-maxage=60, stale-while-revalidate=300'
+MAX_CACHED_RESPONSES = 256  # 带参数的响应按参数缓存，最多留这么多份
+QUERY_PARAMS = ('category', 'limit', 'cursor', 'since', 'q', 'fields')
+ALL_CATEGORIES = 'all'
+MAX_LIMIT = 200
+TIMESTAMP_MIN = 10 ** 9     # since 不小于这个数时按 Unix 时间戳处理，否则是版本号
+MIN_COMPRESS_BYTES = 512    # 太小的响应不压缩
+
+# 示例数据（数据文件还没生成时返回）
+PLACEHOLDER = {
+    "shanghai": [{"title": "数据加载中...", "link": "#", "source": "系统", "time": ""}],
+    "world": [],
+    "ai": [],
+    "stocks": [],
+    "policy": []
+}
+
+
+class CachedResponse:
+    """编码好的响应：原文、gzip、br 和 ETag，只在数据变化时生成一次"""
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.variants = {}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.variants['gzip'] = gzip.compress(body, compresslevel=6, mtime=0)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(body, quality=5)
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    def pick(self, accept_encoding):
+        """按 Accept-Encoding 选一个版本，返回 (编码, 内容)"""
+        accepted = {part.split(';')[0].strip() for part in (accept_encoding or '').lower().split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in self.variants:
+                return encoding, self.variants[encoding]
+        return None, self.body
+
+
+class QueryError(ValueError):
+    """查询参数不合法，回 400"""
+
+
+def _search_text(item):
+    return ' '.join(str(item.get(key) or '') for key in ('title', 'summary', 'source')).lower()
+
+
+class SnapshotIndex:
+    """
+    快照加载时按分类预先建好的索引：每个分类的条目列表（带上 category 和 id）、
+    "分类:id" -> 位置（翻页游标用）、小写的检索文本；"all" 是所有分类按顺序拼起来
+    """
+
+    def __init__(self, data):
+        self.entries = {}
+        for category, items in data.items():
+            if not isinstance(items, list):
+                continue
+            records = []
+            for item in items:
+                record = dict(item, category=category)
+                record['id'] = item.get('id') or item_id(item.get('link', ''), item.get('title', ''))
+                records.append(record)
+            self.entries[category] = records
+        self.entries[ALL_CATEGORIES] = [record for records in list(self.entries.values()) for record in records]
+        self.positions = {
+            category: {cursor_of(record): position for position, record in enumerate(records)}
+            for category, records in self.entries.items()
+        }
+        self.texts = {
+            category: [_search_text(record) for record in records]
+            for category, records in self.entries.items()
+        }
+
+    def query(self, category, q=None, cursor=None, limit=None):
+        """
+        返回 (本页条目, 命中总数, 下一页游标)
+        q 是对当前快照（几百条）标题/摘要/来源的逐条子串匹配，不走索引；
+        要分词排序、覆盖最近两周的全文检索用 /api/search（见 backend/search_index.py）
+        """
+        records = self.entries[category]
+        terms = (q or '').lower().split()
+        if terms:
+            matched = [position for position, text in enumerate(self.texts[category])
+                       if all(term in text for term in terms)]
+        else:
+            matched = range(len(records))
+
+        start = 0
+        if cursor:
+            position = self.positions[category].get(cursor)
+            if position is None:
+                raise QueryError("cursor 已失效（快照已更新），请从第一页重新取")
+            start = bisect.bisect_right(matched, position)
+        page = matched[start:start + limit] if limit else matched[start:]
+        more = start + len(page) < len(matched)
+        items = [records[position] for position in page]
+        return items, len(matched), cursor_of(items[-1]) if more and items else None
+
+
+def cursor_of(record):
+    return f"{record['category']}:{record['id']}"
+
+
+def project(items, fields):
+    """只留下要的字段（id、category 总是保留）"""
+    if not fields:
+        return items
+    keep = set(fields) | {'id', 'category'}
+    return [{key: value for key, value in item.items() if key in keep} for item in items]
+
+
+_lock = threading.Lock()
+_snapshot = {"key": None, "data": PLACEHOLDER, "index": None, "response": None}
+_responses = OrderedDict()  # (查询参数, 快照键, 增量索引键) -> CachedResponse
+
+
+def _file_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_snapshot():
+    """当前快照（解析后的数据, 分类索引, 编码好的响应），文件的 mtime/大小变了才重新读"""
+    key = _file_key(DATA_PATH)
+    with _lock:
+        if _snapshot["response"] is None or key != _snapshot["key"]:
+            try:
+                with open(DATA_PATH, 'rb') as f:
+                    raw = f.read()
+                data = json.loads(raw)
+                # publisher 写的已经是紧凑 JSON，直接用文件内容，不再重新序列化
+                response = CachedResponse(raw)
+            except (OSError, ValueError):
+                data = PLACEHOLDER
+                response = CachedResponse.from_data(data)
+            _snapshot.update(key=key, data=data, index=SnapshotIndex(data), response=response)
+            _responses.clear()
+        return _snapshot["data"], _snapshot["index"], _snapshot["response"]
+
+
+def parse_params(query):
+    """把查询参数整理成规范形式（也用作缓存键），不合法时抛 QueryError"""
+    params = {name: values[0].strip() for name, values in query.items() if name in QUERY_PARAMS and values}
+    if 'since' in params:
+        try:
+            params['since'] = int(params['since'])
+        except ValueError:
+            raise QueryError("since 必须是整数版本号或 Unix 时间戳")
+        # 增量是一次给全的，不分页；不报错的话 limit/cursor 会被悄悄忽略
+        if 'limit' in params or 'cursor' in params:
+            raise QueryError("since 不能和 limit/cursor 一起用（增量不分页）")
+    if 'limit' in params:
+        try:
+            params['limit'] = int(params['limit'])
+        except ValueError:
+            raise QueryError("limit 必须是整数")
+        if not 1 <= params['limit'] <= MAX_LIMIT:
+            raise QueryError(f"limit 范围是 1~{MAX_LIMIT}")
+    if 'fields' in params:
+        params['fields'] = tuple(sorted({field.strip() for field in params['fields'].split(',') if field.strip()}))
+    return params
+
+
+def build_response(params, data, index):
+    category = params.get('category') or ALL_CATEGORIES
+    fields = params.get('fields')
+    if category not in index.entries:
+        raise QueryError(f"未知分类: {category}")
+
+    if 'since' in params:
+        # ?since=N：只给版本 N（或某个时间点）之后的变化；太旧时给完整快照和当前版本号
+        since = params['since']
+        if since >= TIMESTAMP_MIN:
+            since = deltas.version_at(since)
+        version, delta = deltas.since(since)
+        if delta is None:
+            if len(params) == 1:
+                return {"version": version, "full": True, "data": data}
+            items, total, _ = index.query(category, params.get('q'))
+            return {"version": version, "full": True, "category": category, "total": total,
+                    "items": project(items, fields)}
+        if category != ALL_CATEGORIES:
+            for action in ('added', 'updated', 'removed'):
+                delta[action] = [item for item in delta[action] if item['category'] == category]
+        terms = (params.get('q') or '').lower().split()
+        for action in ('added', 'updated'):
+            if terms:
+                delta[action] = [item for item in delta[action] if all(term in _search_text(item) for term in terms)]
+            delta[action] = project(delta[action], fields)
+        return delta
+
+    items, total, next_cursor = index.query(category, params.get('q'), params.get('cursor'), params.get('limit'))
+    return {
+        "version": deltas.load_index()['version'],
+        "category": category,
+        "total": total,
+        "items": project(items, fields),
+        "next": next_cursor,
+    }
+
+
+def respond(query):
+    """
+    不带参数时给完整快照；带 since 时给增量（可再用 category / q / fields 过滤，不能分页）；
+    带 category / limit / cursor / q / fields 时从分类索引里取一页
+    结果按规范化后的参数缓存，快照或增量索引变了就失效
+    """
+    data, index, snapshot_response = load_snapshot()
+    params = parse_params(query)
+    if not params:
+        return snapshot_response
+    key = (tuple(sorted(params.items())), _snapshot["key"],
+           _file_key(os.path.join(deltas.DELTA_DIR, deltas.INDEX_NAME)))
+    with _lock:
+        if key in _responses:
+            _responses.move_to_end(key)
+            return _responses[key]
+    response = CachedResponse.from_data(build_response(params, data, index))
+    with _lock:
+        _responses[key] = response
+        while len(_responses) > MAX_CACHED_RESPONSES:
+            _responses.popitem(last=False)
+    return response
+
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
+        try:
+            response = respond(parse_qs(urlparse(self.path).query))
+        except QueryError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+
+        self.send_cached(response)
+        return
+
+    def send_cached(self, response):
+        if_none_match = self.headers.get('If-None-Match', '')
+        tags = {tag.strip().replace('W/', '', 1) for tag in if_none_match.split(',')}
+        if response.etag in tags or if_none_match.strip() == '*':
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.send_header('Cache-Control', CACHE_CONTROL)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
+
+        encoding, body = response.pick(self.headers.get('Accept-Encoding'))
         self.send_response(200)
         self.send_header('Content-Type', 'application/json; charset=utf-8')
         self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', CACHE_CONTROL)
+        self.send_header('ETag', response.etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        
-        # 读取本地数据文件（Vercel 部署时需要改用外部存储）
-        data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'news.json')
-        
-        try:
-            with open(data_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except:
-            # 返回示例数据
-            data = {
-                "shanghai": [{"title": "数据加载中...", "link": "#", "source": "系统", "time": ""}],
-                "world": [],
-                "ai": [],
-                "stocks": [],
-                "policy": []
-            }
-        
-        self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
-        return
+        self.wfile.write(body)
+
+    def send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
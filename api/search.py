@@ -0,0 +1,62 @@
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from search_index import INDEX_FILE, SearchIndex
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+CACHE_CONTROL = 'public, max-age=60, s-maxage=60'
+
+_lock = threading.Lock()
+_loaded = {"key": None, "index": None}
+
+
+def load_index():
+    """检索索引，文件的 mtime/大小变了才重新读"""
+    try:
+        stat = os.stat(INDEX_FILE)
+        key = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        key = None
+    with _lock:
+        if _loaded["index"] is None or key != _loaded["key"]:
+            _loaded.update(key=key, index=SearchIndex.load(INDEX_FILE))
+        return _loaded["index"]
+
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        q = (query.get('q') or [''])[0].strip()
+        category = (query.get('category') or [''])[0].strip() or None
+        try:
+            limit = int((query.get('limit') or [DEFAULT_LIMIT])[0])
+        except ValueError:
+            limit = 0
+        if not q or not 1 <= limit <= MAX_LIMIT:
+            self.send_json(400, {"error": f"需要 q 参数，limit 范围是 1~{MAX_LIMIT}"})
+            return
+
+        index = load_index()
+        started = time.perf_counter()
+        results, total = index.search(q, category=category, limit=limit)
+        took = (time.perf_counter() - started) * 1000
+        self.send_json(200, {"q": q, "total": total, "took_ms": round(took, 3), "items": results})
+        return
+
+    def send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if status == 200:
+            self.send_header('Cache-Control', CACHE_CONTROL)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
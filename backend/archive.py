@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+历史归档
+每次发布把新出现的条目（或内容变了的条目）追加到当天的 SQLite 文件 data/archive/YYYY-MM-DD.db，
+data/archive/index.db 按条目 ID、分类、时间记下每个版本在哪一天的文件里，按 ID 查历史、
+按分类和时间段查都只打开相关的那几天；每轮只写新条目，不重写旧数据。
+过了当天的文件做压实（同一天内同一条只留最后一个版本，再 VACUUM），超过保留期的整天删掉
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from publisher import ARCHIVE_DIR, content_hash
+
+INDEX_NAME = "index.db"
+RETENTION_DAYS = int(os.environ.get('NEWS_ARCHIVE_DAYS', 365))
+COMPACT_AFTER_DAYS = 1   # 不再写入的日文件（今天以前的）才压实
+
+
+def _day_of(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+
+
+def _connect(path):
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class Archive:
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._latest = {}      # (id, 分类) -> 最新归档版本的内容哈希
+        self._day = None       # 当前写入的日期和连接
+        self._day_conn = None
+        self._index = _connect(self.root / INDEX_NAME)
+        self._index.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id TEXT,
+                category TEXT,
+                archived_at REAL,
+                day TEXT,
+                content TEXT
+            );
+            CREATE INDEX IF NOT EXISTS entries_id ON entries (id, archived_at);
+            CREATE INDEX IF NOT EXISTS entries_category ON entries (category, archived_at);
+            CREATE TABLE IF NOT EXISTS latest (
+                id TEXT,
+                category TEXT,
+                content TEXT,
+                PRIMARY KEY (id, category)
+            );
+            CREATE TABLE IF NOT EXISTS days (
+                day TEXT PRIMARY KEY,
+                items INTEGER DEFAULT 0,
+                compacted INTEGER DEFAULT 0
+            );
+        """)
+        self._index.commit()
+
+    def _day_path(self, day):
+        return self.root / f"{day}.db"
+
+    def _open_day(self, day):
+        conn = _connect(self._day_path(day))
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                seq INTEGER PRIMARY KEY,
+                id TEXT,
+                category TEXT,
+                archived_at REAL,
+                content TEXT,
+                data TEXT
+            );
+            CREATE INDEX IF NOT EXISTS items_category ON items (category, archived_at);
+            CREATE INDEX IF NOT EXISTS items_id ON items (id);
+        """)
+        return conn
+
+    def _writer(self, day):
+        if self._day != day:
+            if self._day_conn is not None:
+                self._day_conn.close()
+            self._day, self._day_conn = day, self._open_day(day)
+        return self._day_conn
+
+    def _load_latest(self, keys):
+        """内存里没有的键去 index.db 批量查（进程刚启动时才会走到）"""
+        missing = [key for key in keys if key not in self._latest]
+        for start in range(0, len(missing), 400):
+            chunk = missing[start:start + 400]
+            conditions = " OR ".join("(id = ? AND category = ?)" for _ in chunk)
+            params = [value for key in chunk for value in key]
+            for row_id, category, content in self._index.execute(
+                    f"SELECT id, category, content FROM latest WHERE {conditions}", params):
+                self._latest[(row_id, category)] = content
+            for key in chunk:
+                self._latest.setdefault(key, None)
+
+    def append(self, data, now=None):
+        """把快照里新出现或内容变了（忽略易变字段）的条目追加到当天的文件，返回追加条数"""
+        now = now or time.time()
+        day = _day_of(now)
+        with self._lock:
+            candidates = []
+            for category, items in data.items():
+                if not isinstance(items, list):
+                    continue
+                for item in items:
+                    item_id = item.get('id') or item.get('link', '')
+                    if item_id:
+                        candidates.append(((item_id, category), item))
+            self._load_latest([key for key, _ in candidates])
+
+            rows = []
+            for key, item in candidates:
+                content = content_hash(item)
+                if self._latest.get(key) == content:
+                    continue
+                self._latest[key] = content
+                rows.append((key[0], key[1], now, content, json.dumps(item, ensure_ascii=False)))
+            if not rows:
+                return 0
+
+            # 先写日文件再写索引：中途失败最多多出没被索引的行，不会有指向空处的索引
+            conn = self._writer(day)
+            conn.executemany(
+                "INSERT INTO items (id, category, archived_at, content, data) VALUES (?, ?, ?, ?, ?)", rows)
+            conn.commit()
+            self._index.executemany(
+                "INSERT INTO entries (id, category, archived_at, day, content) VALUES (?, ?, ?, ?, ?)",
+                [(row_id, category, at, day, content) for row_id, category, at, content, _ in rows])
+            self._index.executemany("""
+                INSERT INTO latest (id, category, content) VALUES (?, ?, ?)
+                ON CONFLICT(id, category) DO UPDATE SET content = excluded.content
+            """, [(row_id, category, content) for row_id, category, _, content, _ in rows])
+            self._index.execute("""
+                INSERT INTO days (day, items) VALUES (?, ?)
+                ON CONFLICT(day) DO UPDATE SET items = days.items + excluded.items
+            """, (day, len(rows)))
+            self._index.commit()
+            return len(rows)
+
+    # ---- 查询 ----
+
+    def _days_between(self, start, end):
+        with self._lock:
+            return [row[0] for row in self._index.execute(
+                "SELECT day FROM days WHERE day BETWEEN ? AND ? ORDER BY day", (_day_of(start), _day_of(end)))]
+
+    def range(self, start, end, category=None, keyword=None, limit=None):
+        """
+        [start, end] 时间段里归档的条目（时间戳），新的在前；每条加上 category 和 archivedAt
+        keyword 在标题/摘要里做子串匹配
+        """
+        results = []
+        for day in reversed(self._days_between(start, end)):
+            path = self._day_path(day)
+            if not path.exists():
+                continue
+            sql = "SELECT category, archived_at, data FROM items WHERE archived_at BETWEEN ? AND ?"
+            params = [start, end]
+            if category:
+                sql += " AND category = ?"
+                params.append(category)
+            if keyword:
+                sql += " AND data LIKE ?"
+                params.append(f"%{keyword}%")
+            sql += " ORDER BY archived_at DESC, seq DESC"
+            conn = _connect(path)
+            try:
+                for row_category, archived_at, data in conn.execute(sql, params):
+                    item = json.loads(data)
+                    text = f"{item.get('title', '')} {item.get('summary', '')}".lower()
+                    if keyword and keyword.lower() not in text:
+                        continue
+                    results.append(dict(item, category=row_category, archivedAt=archived_at))
+                    if limit and len(results) >= limit:
+                        return results
+            finally:
+                conn.close()
+        return results
+
+    def history(self, item_id):
+        """某条目所有归档版本（按时间先后），每条加上 category 和 archivedAt"""
+        with self._lock:
+            rows = self._index.execute(
+                "SELECT category, archived_at, day FROM entries WHERE id = ? ORDER BY archived_at", (item_id,)
+            ).fetchall()
+        versions = []
+        by_day = {}
+        for category, archived_at, day in rows:
+            by_day.setdefault(day, []).append((category, archived_at))
+        for day in sorted(by_day):
+            path = self._day_path(day)
+            if not path.exists():
+                continue
+            conn = _connect(path)
+            try:
+                for category, archived_at, data in conn.execute(
+                        "SELECT category, archived_at, data FROM items WHERE id = ? ORDER BY seq", (item_id,)):
+                    versions.append(dict(json.loads(data), category=category, archivedAt=archived_at))
+            finally:
+                conn.close()
+        return versions
+
+    # ---- 保留期与压实 ----
+
+    def maintain(self, today=None):
+        """删掉超过保留期的日文件，压实今天以前还没压实过的，返回 (删除天数, 压实天数)"""
+        today = today or date.today()
+        expire_before = (today - timedelta(days=RETENTION_DAYS)).isoformat()
+        compact_before = (today - timedelta(days=COMPACT_AFTER_DAYS - 1)).isoformat()
+        with self._lock:
+            expired = [row[0] for row in self._index.execute("SELECT day FROM days WHERE day < ?", (expire_before,))]
+            pending = [row[0] for row in self._index.execute(
+                "SELECT day FROM days WHERE day < ? AND day >= ? AND compacted = 0", (compact_before, expire_before))]
+
+        for day in expired:
+            with self._lock:
+                if self._day == day:
+                    self._day_conn.close()
+                    self._day, self._day_conn = None, None
+                for suffix in ('', '-journal', '-wal', '-shm'):
+                    try:
+                        os.remove(f"{self._day_path(day)}{suffix}")
+                    except FileNotFoundError:
+                        pass
+                self._index.execute("DELETE FROM entries WHERE day = ?", (day,))
+                self._index.execute("DELETE FROM days WHERE day = ?", (day,))
+                self._index.commit()
+        if expired:
+            # 条目的所有版本都过期了就不用再记最新哈希（再出现会当新条目归档）
+            with self._lock:
+                self._index.execute(
+                    "DELETE FROM latest WHERE NOT EXISTS "
+                    "(SELECT 1 FROM entries WHERE entries.id = latest.id AND entries.category = latest.category)")
+                self._index.commit()
+                self._latest.clear()
+
+        for day in pending:
+            self._compact(day)
+        return len(expired), len(pending)
+
+    def _compact(self, day):
+        """同一天里同一条（ID + 分类）只留最后一个版本，索引同步删掉，再 VACUUM 回收空间"""
+        path = self._day_path(day)
+        if not path.exists():
+            return
+        conn = _connect(path)
+        try:
+            superseded = conn.execute("""
+                SELECT seq, id, category, archived_at FROM items
+                WHERE seq NOT IN (SELECT MAX(seq) FROM items GROUP BY id, category)
+            """).fetchall()
+            conn.execute("DELETE FROM items WHERE seq NOT IN (SELECT MAX(seq) FROM items GROUP BY id, category)")
+            conn.commit()
+            conn.execute("VACUUM")
+            remaining = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        finally:
+            conn.close()
+        with self._lock:
+            self._index.executemany(
+                "DELETE FROM entries WHERE id = ? AND category = ? AND archived_at = ? AND day = ?",
+                [(row_id, category, archived_at, day) for _, row_id, category, archived_at in superseded])
+            self._index.execute("UPDATE days SET items = ?, compacted = 1 WHERE day = ?", (remaining, day))
+            self._index.commit()
+
+    def stats(self):
+        with self._lock:
+            days, items = self._index.execute("SELECT COUNT(*), COALESCE(SUM(items), 0) FROM days").fetchone()
+        size = sum(path.stat().st_size for path in self.root.glob('*.db'))
+        return {"days": days, "items": items, "bytes": size}
+
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def get_archive(root=ARCHIVE_DIR):
+    """进程内共享的归档"""
+    root = Path(root)
+    with _archives_lock:
+        if root not in _archives:
+            _archives[root] = Archive(root)
+        return _archives[root]
+
+
+def append(data, root=ARCHIVE_DIR):
+    """发布时调用：追加新条目，返回追加条数"""
+    return get_archive(root).append(data)
+
+
+def maintain(root=ARCHIVE_DIR, today=None):
+    """删过期日文件、压实旧日文件；常驻进程每天调一次（见 scheduler.maintain_if_due）"""
+    expired, compacted = get_archive(root).maintain(today)
+    if expired or compacted:
+        print(f"🗄️ 归档: 删除过期 {expired} 天，压实 {compacted} 天")
+
+
+def print_stats(root=ARCHIVE_DIR):
+    stats = get_archive(root).stats()
+    if stats['days']:
+        print(f"\n🗄️ 归档: {stats['days']} 天，{stats['items']} 个版本，{stats['bytes'] / 1024 / 1024:.1f}MB")
+
+
+if __name__ == "__main__":
+    # 用法: python backend/archive.py [天数=7] [分类] [关键词]
+    import sys
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    category = sys.argv[2] if len(sys.argv) > 2 else None
+    keyword = sys.argv[3] if len(sys.argv) > 3 else None
+    end = time.time()
+    for item in get_archive().range(end - days * 86400, end, category=category, keyword=keyword, limit=50):
+        print(f"{_day_of(item['archivedAt'])}  [{item['category']}] {item.get('title', '')}")
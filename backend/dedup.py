@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+跨源近似重复检测
+标题规范化（去 emoji/标点、转小写）后取中文二元组 + 英文单词作为特征，
+MinHash 签名分段做 LSH 找候选对，再用真实 Jaccard 相似度确认，整体随条目数近似线性。
+同一来源的两条只有 ID 相同才合并（同一个源不会把一件事发两遍，标题相近多半是不同的事）
+"""
+
+import random
+import re
+import time
+
+from url_canon import assign_ids
+
+NUM_BINS = 16            # MinHash 签名长度（单次哈希分桶，16 个桶）
+BAND_ROWS = 2            # LSH 每段几行（16 / 2 = 8 段）
+# 特征集合 Jaccard 相似度达到多少算同一条：只差一个关键字的标题（涨/跌、今日/明日、
+# rise/fall）在 0.6~0.75 之间，加前后缀、改几个字的转载一般在 0.8 以上
+THRESHOLD = 0.8
+
+_TOKEN = re.compile(r'[\u4e00-\u9fff]+|[a-z0-9]+')
+
+
+def features(title):
+    """
+    标题规范化后的特征集合：转小写，emoji 标记、标点、空白都丢掉，
+    中文按二元组切分（单个汉字的片段保留原字），英文/数字取单词和相邻两词，
+    这样只差一个词的短英文标题（rises / falls）不会被误判成同一条
+    """
+    result = set()
+    previous_word = None
+    for token in _TOKEN.findall(title.lower()):
+        if token[0] >= '\u4e00':
+            if len(token) == 1:
+                result.add(token)
+            else:
+                result.update(token[i:i + 2] for i in range(len(token) - 1))
+            previous_word = None
+        else:
+            result.add(token)
+            if previous_word:
+                result.add(f"{previous_word} {token}")
+            previous_word = token
+    return result
+
+
+def minhash(feature_set):
+    """
+    MinHash 签名（单次哈希 + 分桶的做法，每个特征只算一次哈希）：
+    哈希值低 4 位选桶，每个桶记最小值；空桶借用后面第一个非空桶的值并记下距离
+    特征用内置 hash，只需在同一进程内可比
+    """
+    mins = [None] * NUM_BINS
+    for feature in feature_set:
+        h = hash(feature) & 0xFFFFFFFFFFFF
+        slot = h % NUM_BINS
+        value = h // NUM_BINS
+        if mins[slot] is None or value < mins[slot]:
+            mins[slot] = value
+    signature = []
+    for slot in range(NUM_BINS):
+        for distance in range(NUM_BINS):
+            value = mins[(slot + distance) % NUM_BINS]
+            if value is not None:
+                signature.append((value, distance))
+                break
+    return tuple(signature)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def find_clusters(titles, threshold=THRESHOLD, ids=None, sources=None):
+    """
+    返回近似重复的分组（每组是 titles 的下标列表，按下标排序），不重复的条目自成一组
+    ids: 可选的条目 ID 列表，ID 相同（规范化后是同一个链接）的直接算同一条
+    sources: 可选的来源列表，来源相同的两条不按标题相似度合并
+    """
+    parent = list(range(len(titles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    feature_sets = [features(title) for title in titles]
+    buckets = {}
+    exact = {}
+    for i, feature_set in enumerate(feature_sets):
+        if not feature_set:
+            # 没有可用特征（纯 emoji/符号），只按原标题精确去重
+            exact.setdefault(titles[i], []).append(i)
+            continue
+        signature = minhash(feature_set)
+        for band in range(0, NUM_BINS, BAND_ROWS):
+            buckets.setdefault((band, signature[band:band + BAND_ROWS]), []).append(i)
+
+    # 同一个桶里的条目逐个和前面的比，确认相似才合并（桶一般只有两三个）
+    checked = set()
+    for members in buckets.values():
+        for k in range(1, len(members)):
+            j = members[k]
+            for i in members[:k]:
+                if find(i) == find(j):
+                    break
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if sources and sources[i] and sources[i] == sources[j]:
+                    continue
+                if jaccard(feature_sets[i], feature_sets[j]) >= threshold:
+                    union(i, j)
+                    break
+    if ids:
+        for i, value in enumerate(ids):
+            exact.setdefault(('id', value), []).append(i)
+    for members in exact.values():
+        for other in members[1:]:
+            union(members[0], other)
+
+    clusters = {}
+    for i in range(len(titles)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+def dedup_items(items, threshold=THRESHOLD):
+    """
+    合并近似重复的新闻：每组保留 score 最高的一条（同分取靠前的），
+    其余来源记在代表条目的 otherSources 里；输出顺序按每组第一次出现的位置
+    """
+    assign_ids(items)
+    clusters = find_clusters([item['title'] for item in items], threshold,
+                             [item['id'] for item in items], [item.get('source') for item in items])
+    clusters.sort(key=lambda members: members[0])
+    unique_items = []
+    for members in clusters:
+        best = max(members, key=lambda i: (items[i].get('score', 0), -i))
+        representative = items[best]
+        others = []
+        for i in members:
+            source = items[i].get('source')
+            if i != best and source != representative.get('source') \
+                    and source not in (other['source'] for other in others):
+                others.append({'source': source, 'link': items[i].get('link', '')})
+        # 同一个条目对象每轮都会重新合并，这里覆盖掉上一轮的结果
+        if others:
+            representative['otherSources'] = others
+        else:
+            representative.pop('otherSources', None)
+        unique_items.append(representative)
+    return unique_items
+
+
+def benchmark(count=5000, seed=1):
+    """合成标题（含带前缀/后缀的转载变体）测一下耗时和合并效果"""
+    rng = random.Random(seed)
+    chars = [chr(code) for code in range(0x4e00, 0x4e00 + 3000)]
+    items = []
+    originals = count // 2
+    for i in range(originals):
+        title = ''.join(rng.choice(chars) for _ in range(rng.randint(12, 30)))
+        items.append({'title': title, 'source': f'源{i % 7}', 'link': f'https://a.example.com/{i}'})
+    for i in range(count - originals):
+        base = items[rng.randrange(originals)]['title']
+        # 转载：加 emoji/栏目前缀或来源后缀（改一个字的短标题多半是另一件事，不算变体）
+        prefix = rng.choice(['', '🏠 ', '📈 ', '【快讯】'])
+        suffix = rng.choice(['', ' - 新华网', '｜澎湃'])
+        items.append({'title': prefix + base + suffix, 'source': f'源{i % 5 + 7}',
+                      'link': f'https://b.example.com/{i}'})
+
+    t0 = time.perf_counter()
+    unique_items = dedup_items(items)
+    elapsed = time.perf_counter() - t0
+    print(f"📏 {count} 条（其中 {count - originals} 条是变体）-> {len(unique_items)} 条，耗时 {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    benchmark()
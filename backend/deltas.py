@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+增量更新（delta）
+每次发布快照版本号加一，并在 data/deltas/<版本>.json 记下相对上一版新增、更新、删除了哪些条目；
+轮询的页面带上自己手里的版本号，只取这之后的变化，太旧（增量已被清掉）时才给完整快照
+"""
+
+import bisect
+import json
+import time
+from pathlib import Path
+
+from publisher import DELTA_DIR, atomic_write, content_hash, serialize
+
+# {"version", "oldest", "generated", "history"}：当前版本、还保留着的最早增量、各版本的发布时间
+INDEX_NAME = "index.json"
+KEEP_VERSIONS = 100         # 保留最近多少份增量（5 分钟一轮大约 8 小时）
+
+
+def _entry_key(category, item):
+    """同一条新闻可能同时出现在两个分类里，按 (分类, id) 区分"""
+    return f"{category}:{item.get('id') or item.get('link', '')}"
+
+
+def _entries(data):
+    """{键: (分类, 条目)}，只看列表字段"""
+    entries = {}
+    for category, items in (data or {}).items():
+        if isinstance(items, list):
+            for item in items:
+                entries[_entry_key(category, item)] = (category, item)
+    return entries
+
+
+def diff(previous, current):
+    """
+    两个快照之间的变化：{"added": [条目], "updated": [条目], "removed": [{id, category}]}
+    条目带上 category 字段；只改了易变字段（时间、isNew、配图耗时）的不算更新
+    """
+    old = _entries(previous)
+    new = _entries(current)
+    added, updated, removed = [], [], []
+    for key, (category, item) in new.items():
+        record = dict(item, category=category)
+        if key not in old:
+            added.append(record)
+        elif content_hash(item) != content_hash(old[key][1]):
+            updated.append(record)
+    for key, (category, item) in old.items():
+        if key not in new:
+            removed.append({"id": item.get('id') or item.get('link', ''), "category": category})
+    return {"added": added, "updated": updated, "removed": removed}
+
+
+def load_index(delta_dir=DELTA_DIR):
+    try:
+        with open(Path(delta_dir) / INDEX_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"version": 0, "oldest": 1}
+
+
+def record(previous, current, delta_dir=DELTA_DIR):
+    """
+    发布新快照后调用：版本号加一，写出相对上一版的增量，清掉超出保留数的旧增量，返回新版本号
+    增量文件先写，索引最后替换
+    """
+    delta_dir = Path(delta_dir)
+    index = load_index(delta_dir)
+    version = index['version'] + 1
+    delta = diff(previous, current)
+    delta.update({"version": version, "base": version - 1, "generated": int(time.time())})
+    atomic_write(delta_dir / f"{version}.json", serialize(delta))
+
+    oldest = max(index.get('oldest', 1), version - KEEP_VERSIONS + 1)
+    # 没有上一版（第一次发布或索引丢了）时这份增量不完整，不能从更早的版本接上
+    if previous is None:
+        oldest = version + 1
+    for path in delta_dir.glob('*.json'):
+        if path.stem.isdigit() and int(path.stem) < oldest:
+            path.unlink()
+    # 还能接上的版本（oldest - 1 起）的发布时间，按时间戳查版本用
+    history = [entry for entry in index.get('history', []) if entry[0] >= oldest - 1]
+    history.append([version, delta['generated']])
+    index = {"version": version, "oldest": oldest, "generated": delta['generated'], "history": history}
+    atomic_write(delta_dir / INDEX_NAME, serialize(index))
+    return version
+
+
+def version_at(timestamp, delta_dir=DELTA_DIR):
+    """时间戳对应的版本（当时最新发布的那一版）；比记录里最早的还早时返回 -1（只能给完整快照）"""
+    history = load_index(delta_dir).get('history', [])
+    position = bisect.bisect_right([generated for _, generated in history], timestamp)
+    return history[position - 1][0] if position else -1
+
+
+def since(version, delta_dir=DELTA_DIR):
+    """
+    把 version 之后的各份增量合并成一份，返回 (当前版本, 增量)；
+    还没有任何版本、version 太旧（需要的增量已被清掉）或比当前版本还新（版本号被重置过）时
+    返回 (当前版本, None)，调用方应改给完整快照
+    """
+    delta_dir = Path(delta_dir)
+    index = load_index(delta_dir)
+    current = index['version']
+    if not current or version > current or version + 1 < index.get('oldest', 1):
+        return current, None
+
+    first = {}   # 键 -> 窗口内第一次出现的动作，用来判断版本 version 时这条在不在
+    latest = {}  # 键 -> 最新条目，None 表示已删除
+    for number in range(version + 1, current + 1):
+        try:
+            with open(delta_dir / f"{number}.json", 'r', encoding='utf-8') as f:
+                delta = json.load(f)
+        except (OSError, ValueError):
+            return current, None
+        for action in ('added', 'updated'):
+            for item in delta[action]:
+                key = _entry_key(item['category'], item)
+                first.setdefault(key, action)
+                latest[key] = item
+        for item in delta['removed']:
+            key = _entry_key(item['category'], item)
+            first.setdefault(key, 'removed')
+            latest[key] = None
+
+    merged = {"version": current, "base": version, "added": [], "updated": [], "removed": []}
+    for key, item in latest.items():
+        existed = first[key] != 'added'
+        if item is None:
+            if existed:
+                category, _, item_id = key.partition(':')
+                merged['removed'].append({"id": item_id, "category": category})
+        elif existed:
+            merged['updated'].append(item)
+        else:
+            merged['added'].append(item)
+    return current, merged
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+RSS 条件请求缓存
+按 URL 记住 ETag / Last-Modified / 内容哈希和上次解析出的条目，
+源没更新时（304 或内容完全一样）直接复用上次的条目，不再重新 feedparser.parse
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import feedparser
+
+import http_client
+
+CACHE_FILE = Path(__file__).parent.parent / "data" / "cache" / "feed_cache.json"
+# 每个源最多缓存多少条（抓取时最多也只取前 10 条左右）
+MAX_CACHED_ENTRIES = 30
+
+_cache = None
+_lock = threading.Lock()
+_counters = {'not_modified': 0, 'same_body': 0, 'parsed': 0}
+
+
+def _count(key):
+    with _lock:
+        _counters[key] += 1
+
+
+def _revive(value):
+    """JSON 读回来的条目还原成 FeedParserDict，*_parsed 字段还原成 struct_time"""
+    if isinstance(value, dict):
+        entry = feedparser.FeedParserDict()
+        for key, item in value.items():
+            if key.endswith('_parsed') and isinstance(item, list) and len(item) == 9:
+                entry[key] = time.struct_time(item)
+            else:
+                entry[key] = _revive(item)
+        return entry
+    if isinstance(value, list):
+        return [_revive(item) for item in value]
+    return value
+
+
+def _load():
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            for record in raw.values():
+                record['entries'] = _revive(record.get('entries', []))
+            _cache = raw
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+
+def save():
+    """把缓存写回磁盘（先写临时文件再替换，避免写一半）"""
+    with _lock:
+        if _cache is None:
+            return
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = CACHE_FILE.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(_cache, f, ensure_ascii=False, default=str)
+        os.replace(tmp_file, CACHE_FILE)
+
+
+def fetch_entries(url, headers=None, timeout=None, use_proxy=True, decode=False):
+    """
+    抓取并解析 RSS，返回条目列表；请求失败（非 200/304）返回 None
+    decode=True 时按 apparent_encoding 解码后再解析（应对编码声明不对的中文源）
+    """
+    with _lock:
+        cached = _load().get(url)
+
+    request_headers = dict(headers or {})
+    if cached:
+        if cached.get('etag'):
+            request_headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            request_headers['If-Modified-Since'] = cached['last_modified']
+
+    response = http_client.get(url, headers=request_headers, timeout=timeout, use_proxy=use_proxy)
+
+    if response.status_code == 304 and cached:
+        _count('not_modified')
+        return cached['entries']
+    if response.status_code != 200:
+        return None
+
+    body_hash = hashlib.sha1(response.content).hexdigest()
+    if cached and cached.get('body_hash') == body_hash:
+        _count('same_body')
+        entries = cached['entries']
+    else:
+        _count('parsed')
+        if decode:
+            response.encoding = response.apparent_encoding
+            feed = feedparser.parse(response.text)
+        else:
+            feed = feedparser.parse(response.content)
+        entries = feed.entries[:MAX_CACHED_ENTRIES]
+
+    with _lock:
+        _load()[url] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_hash': body_hash,
+            'entries': entries,
+        }
+    return entries
+
+
+def stats():
+    """本进程内的命中统计"""
+    with _lock:
+        return dict(_counters)
+
+
+def print_stats():
+    counters = stats()
+    total = sum(counters.values())
+    if total:
+        unchanged = counters['not_modified'] + counters['same_body']
+        print(f"\n📦 RSS 缓存: {total} 次请求，{unchanged} 个未变化"
+              f"（304: {counters['not_modified']}，内容相同: {counters['same_body']}），重新解析 {counters['parsed']} 个")
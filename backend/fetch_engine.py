@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+并发抓取引擎
+用有界线程池并行执行抓取任务，全局 + 每个域名各自限流
+"""
+
+import os
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# 全局并发上限（同时运行的抓取任务数）
+MAX_WORKERS = int(os.environ.get('NEWS_MAX_WORKERS', 8))
+# 每个域名同时在途的请求数上限（rsshub.app 一类的公共实例别打太狠）
+PER_HOST_LIMIT = int(os.environ.get('NEWS_PER_HOST_LIMIT', 4))
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+def _slot_for(host):
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return _host_slots[host]
+
+
+@contextmanager
+def host_slot(url):
+    """占用目标域名的一个并发名额，用完自动归还"""
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    slot = _slot_for(host)
+    slot.acquire()
+    try:
+        yield
+    finally:
+        slot.release()
+
+
+def run_jobs(jobs, max_workers=None, serial=False):
+    """
+    并行执行一组抓取任务
+    jobs: [(name, func, args), ...]
+    返回 {name: result}，按 jobs 的顺序排列；单个任务出错不影响其他任务，结果为 None
+    """
+    started = time.time()
+    timings = {}
+
+    def run(name, func, args):
+        t0 = time.time()
+        try:
+            return func(*args)
+        except Exception as e:
+            print(f"  ✗ {name}: {str(e)[:50]}")
+            return None
+        finally:
+            timings[name] = time.time() - t0
+
+    if serial:
+        results = {name: run(name, func, args) for name, func, args in jobs}
+    else:
+        workers = max_workers or MAX_WORKERS
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(name, pool.submit(run, name, func, args)) for name, func, args in jobs]
+            # 按提交顺序收集，保证合并结果的顺序是确定的
+            results = {name: future.result() for name, future in futures}
+
+    total = time.time() - started
+    slowest = max(timings.items(), key=lambda kv: kv[1]) if timings else ('-', 0)
+    print(f"\n⏱️ 抓取耗时 {total:.1f}s（最慢: {slowest[0]} {slowest[1]:.1f}s，任务总和 {sum(timings.values()):.1f}s）")
+    return results
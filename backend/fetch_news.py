@@ -5,9 +5,7 @@
 解决：RSS抓取失败、无图片、编码乱码问题
 """
 
-import feedparser
-import requests
-import json
+import hashlib
 import os
 import re
 import random
@@ -16,6 +14,12 @@ from bs4 import BeautifulSoup
 import time
 from urllib.parse import urljoin
 
+import http_client
+import feed_cache
+import publisher
+from dedup import dedup_items
+from image_handler import extract_image_from_entry
+
 # 配置路径
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_FILE = os.path.join(BASE_DIR, 'data', 'data.json')  # 注意前端读取的是 data.json
@@ -56,33 +60,6 @@ RSS_SOURCES = {
     ]
 }
 
-def extract_image_from_entry(entry, source_url):
-    """
-    从RSS条目中提取图片（多种策略）
-    """
-    # 策略1：检查 media:content (最常见)
-    if 'media_content' in entry and entry.media_content:
-        for media in entry.media_content:
-            if media.get('medium') == 'image' or media.get('type', '').startswith('image'):
-                return media.get('url', '')
-    
-    # 策略2：检查 enclosures
-    if 'enclosures' in entry and entry.enclosures:
-        for enc in entry.enclosures:
-            if enc.get('type', '').startswith('image'):
-                return enc.get('href', '')
-    
-    # 策略3：检查 summary/description 中的 img 标签
-    summary = entry.get('summary', entry.get('description', ''))
-    if summary:
-        img_match = re.search(r'<img[^>]+src=["\'](https?://[^"\']+)["\']', summary)
-        if img_match:
-            return img_match.group(1)
-    
-    # 策略4：访问原网页抓取（比较慢，只抓前几条时可用）
-    # 为了速度，这里暂不实现，如需可开启
-    return ""
-
 def fetch_rss_feed(source_name, feed_url, limit=8):
     """
     抓取单个RSS源
@@ -92,11 +69,11 @@ def fetch_rss_feed(source_name, feed_url, limit=8):
     try:
         print(f"📡 正在抓取: {source_name}...")
         
-        # 下载RSS内容（带重试）
+        # 下载并解析RSS（带重试；源没更新时直接复用上次解析结果）
         for attempt in range(3):
             try:
-                resp = requests.get(feed_url, headers=HEADERS, timeout=15)
-                resp.encoding = resp.apparent_encoding  # 自动识别中文编码
+                # decode=True: 自动识别中文编码
+                entries = feed_cache.fetch_entries(feed_url, headers=HEADERS, timeout=15, use_proxy=False, decode=True)
                 break
             except Exception as e:
                 if attempt == 2:
@@ -104,10 +81,11 @@ def fetch_rss_feed(source_name, feed_url, limit=8):
                     return []
                 time.sleep(1)
         
-        # 解析RSS
-        feed = feedparser.parse(resp.text)
+        if entries is None:
+            print(f"   ❌ {source_name} 请求失败")
+            return []
         
-        for i, entry in enumerate(feed.entries[:limit]):
+        for i, entry in enumerate(entries[:limit]):
             try:
                 # 提取发布时间
                 published = ""
@@ -150,7 +128,8 @@ def fetch_rss_feed(source_name, feed_url, limit=8):
                 # 如果没图，使用默认占位图（可选：你也可以准备几张默认图轮换）
                 if not image_url:
                     # 使用picsum随机图作为占位，或留空让前端处理
-                    image_url = f"https://picsum.photos/seed/{hash(entry.title) % 1000}/400/300"
+                    # 种子用 md5 而不是内置 hash（每次运行都不同），否则同样的新闻每次图片都变、快照永远"有变化"
+                    image_url = f"https://picsum.photos/seed/{int(hashlib.md5(entry.title.encode('utf-8')).hexdigest(), 16) % 1000}/400/300"
                 
                 news_item = {
                     "title": entry.get('title', '无标题').strip(),
@@ -200,25 +179,22 @@ def fetch_all_news():
             category_news.extend(news)
             time.sleep(0.5)  # 礼貌延迟，避免被封
         
-        # 去重（按标题）
-        seen_titles = set()
-        unique_news = []
-        for item in category_news:
-            if item["title"] not in seen_titles:
-                seen_titles.add(item["title"])
-                unique_news.append(item)
-        
-        all_data[category] = unique_news
+        # 去重（近似标题合并，其余来源记在 otherSources）
+        all_data[category] = dedup_items(category_news)
     
     # 确保 data 目录存在
     os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
     
-    # 保存为JSON（前端直接读取这个文件）
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(all_data, f, ensure_ascii=False, indent=2)
+    # 保存为JSON（前端直接读取这个文件；原子写入，附带 .gz/.br/.sha256）
+    # 这个版本只写 data/data.json，不出分片、增量、检索索引和归档
+    published = publisher.publish(all_data, targets=[DATA_FILE], shard_root=None, delta_dir=None,
+                                  index_file=None, archive_dir=None)
     
-    print(f"\n💾 数据已保存: {DATA_FILE}")
+    print(f"\n💾 数据已保存: {DATA_FILE}（{publisher.describe(published)}）")
     print(f"📊 总计: {sum(len(v) for v in all_data.values())} 条新闻")
+    feed_cache.save()
+    feed_cache.print_stats()
+    http_client.print_stats()
     return all_data
 
 if __name__ == "__main__":
@@ -4,34 +4,19 @@
 只使用稳定的新闻源
 """
 
-import json
-import requests
 from datetime import datetime
 from pathlib import Path
 
+import hn_client
+import http_client
+import publisher
+from dedup import dedup_items
+from url_canon import assign_ids
+from keyword_matcher import is_shanghai_relevant
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
-PROXY = {'http': 'http://127.0.0.1:1082', 'https': 'http://127.0.0.1:1082'}
-headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'}
-
-def is_shanghai_relevant(title):
-    """判断是否与嘉定相关"""
-    text = title.lower()
-    jiading_keywords = ['嘉定', '南翔', '江桥', '安亭', '马陆', '外冈', '徐行', '华亭', '菊园', '新成路', '真新', '州桥']
-    season_keywords = ['立春', '雨水', '惊蛰', '春分', '清明', '谷雨']
-    community_keywords = ['社区', '街道', '居委会', '物业', '养老', '加装电梯']
-    
-    has_jiading = any(kw in text for kw in jiading_keywords)
-    has_season = any(kw in text for kw in season_keywords)
-    has_community = any(kw in text for kw in community_keywords)
-    
-    return {
-        'jiading': has_jiading,
-        'season': has_season,
-        'community': has_community,
-        'score': int(has_jiading) * 3 + int(has_season) * 2 + int(has_community) * 1
-    }
 
 def fetch_shanghai():
     """抓取上海新闻"""
@@ -40,7 +25,7 @@ def fetch_shanghai():
     # 1. 新浪上海
     try:
         url = "https://feed.mix.sina.com.cn/api/roll/get?pageid=153&lid=2515&k=&num=30&r=0.123"
-        response = requests.get(url, headers=headers, timeout=15, proxies=PROXY)
+        response = http_client.get(url, timeout=15)
         
         if response.status_code == 200:
             data = response.json()
@@ -73,12 +58,7 @@ def fetch_shanghai():
     ])
     
     # 去重排序
-    seen = set()
-    unique = []
-    for item in items:
-        if item['title'] not in seen:
-            seen.add(item['title'])
-            unique.append(item)
+    unique = dedup_items(items)
     unique.sort(key=lambda x: x.get('score', 0), reverse=True)
     return unique
 
@@ -87,15 +67,16 @@ def fetch_world():
     items = []
     try:
         url = "https://www.reddit.com/r/worldnews/new.json?limit=10"
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10, proxies=PROXY)
+        response = http_client.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
         if response.status_code == 200:
             data = response.json()
             for post in data['data']['children']:
                 items.append({
                     "title": post['data']['title'],
                     "link": "https://reddit.com" + post['data']['permalink'],
-                    "summary": f"⬆️ {post['data'].get('score', 0)}",
+                    "summary": "Reddit",
                     "source": "Reddit",
+                    "votes": post['data'].get('score', 0),
                     "time": datetime.now().strftime("%m-%d"),
                     "isNew": True
                 })
@@ -108,22 +89,16 @@ def fetch_ai():
     """抓取AI新闻"""
     items = []
     try:
-        response = requests.get("https://hacker-news.firebaseio.com/v0/topstories.json", timeout=10, proxies=PROXY)
-        top_ids = response.json()[:8]
-        for story_id in top_ids:
-            try:
-                story = requests.get(f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json", timeout=5, proxies=PROXY).json()
-                if story and story.get('title'):
-                    items.append({
-                        "title": story['title'],
-                        "link": story.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
-                        "summary": f"⭐ {story.get('score', 0)} points",
-                        "source": "Hacker News",
-                        "time": datetime.now().strftime("%m-%d"),
-                        "isNew": True
-                    })
-            except:
-                continue
+        for story in hn_client.top_stories(8):
+            items.append({
+                "title": story['title'],
+                "link": story.get('url') or f"https://news.ycombinator.com/item?id={story['id']}",
+                "summary": "Hacker News",
+                "source": "Hacker News",
+                "votes": story.get('score') or 0,
+                "time": datetime.now().strftime("%m-%d"),
+                "isNew": True
+            })
         print(f"✓ Hacker News: {len(items)} 条")
     except Exception as e:
         print(f"✗ Hacker News: {e}")
@@ -155,18 +130,18 @@ def main():
         "stocks": fetch_stocks(),
         "policy": fetch_policy()
     }
+    for items in news_data.values():
+        assign_ids(items)
     
-    # 保存
-    with open(DATA_DIR / "news.json", "w", encoding="utf-8") as f:
-        json.dump(news_data, f, ensure_ascii=False, indent=2)
-    
-    import shutil
-    shutil.copy(DATA_DIR / "news.json", DATA_DIR.parent / "frontend" / "data.json")
-    shutil.copy(DATA_DIR / "news.json", DATA_DIR.parent / "data.json")
+    # 保存（原子写入 data/news.json、frontend/data.json、./data.json，附带 .gz/.br/.sha256）
+    published = publisher.publish(news_data)
+    print(f"\n💾 {publisher.describe(published)}")
     
     print(f"\n✅ 完成! 总计 {sum(len(v) for v in news_data.values())} 条")
     for k, v in news_data.items():
         print(f"  {k}: {len(v)}条")
+    hn_client.save()
+    http_client.print_stats()
 
 if __name__ == "__main__":
     main()
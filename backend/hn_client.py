@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Hacker News 客户端
+榜单每次都取（一个请求），故事详情并发抓取并按 ID 缓存到磁盘：
+标题、链接、作者、发布时间不会变，只有分数/评论数这类字段隔一段时间才刷新
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import http_client
+
+TOP_STORIES_URL = "https://hacker-news.firebaseio.com/v0/topstories.json"
+ITEM_URL = "https://hacker-news.firebaseio.com/v0/item/{}.json"
+CACHE_FILE = Path(__file__).parent.parent / "data" / "cache" / "hn_items.json"
+
+MAX_WORKERS = 8              # 详情并发数（实际还受 http_client 的每域名限流约束）
+SCORE_TTL = 30 * 60          # 分数/评论数多久刷新一次
+CACHE_RETENTION = 3 * 86400  # 多久没上榜的故事从缓存里清掉
+ITEM_TIMEOUT = 5
+
+# 不变字段 + 易变字段，其余字段不存
+STATIC_FIELDS = ('title', 'url', 'by', 'time', 'type')
+VOLATILE_FIELDS = ('score', 'descendants')
+
+_cache = None
+_lock = threading.Lock()
+_counters = {'cached': 0, 'refreshed': 0, 'fetched': 0}
+
+
+def _load():
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                _cache = json.load(f)
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+
+def save():
+    """写回磁盘，顺带清掉很久没上榜的故事"""
+    with _lock:
+        if _cache is None:
+            return
+        cutoff = time.time() - CACHE_RETENTION
+        for story_id in [sid for sid, story in _cache.items() if story.get('seen_at', 0) < cutoff]:
+            del _cache[story_id]
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = CACHE_FILE.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(_cache, f, ensure_ascii=False)
+        os.replace(tmp_file, CACHE_FILE)
+
+
+def _fetch_item(story_id):
+    """抓一条详情，失败返回 None"""
+    try:
+        return http_client.get(ITEM_URL.format(story_id), timeout=ITEM_TIMEOUT).json()
+    except Exception:
+        return None
+
+
+def top_stories(limit=10):
+    """
+    榜单前 limit 条故事（按排名），每条是 {id, title, url, by, time, score, descendants}
+    缓存里有且分数不太旧的不发请求；其余并发抓取，抓取失败的跳过
+    """
+    ranking = http_client.get(TOP_STORIES_URL, timeout=10).json()[:limit]
+    now = time.time()
+
+    with _lock:
+        cache = _load()
+        to_fetch = []
+        for story_id in ranking:
+            story = cache.get(str(story_id))
+            if story is None:
+                to_fetch.append(story_id)
+                _counters['fetched'] += 1
+            elif not story.get('dead') and now - story.get('refreshed_at', 0) >= SCORE_TTL:
+                to_fetch.append(story_id)
+                _counters['refreshed'] += 1
+            else:
+                _counters['cached'] += 1
+
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(to_fetch))) as pool:
+            fetched = dict(zip(to_fetch, pool.map(_fetch_item, to_fetch)))
+    else:
+        fetched = {}
+
+    stories = []
+    with _lock:
+        cache = _load()
+        for story_id in ranking:
+            key = str(story_id)
+            data = fetched.get(story_id)
+            if data is not None:
+                story = cache.setdefault(key, {})
+                if not data.get('title') or data.get('deleted') or data.get('dead'):
+                    story['dead'] = True  # 被删/被标记的故事以后也不用再抓
+                else:
+                    story.update({field: data.get(field) for field in STATIC_FIELDS + VOLATILE_FIELDS})
+                story['refreshed_at'] = now
+            story = cache.get(key)
+            if story is None:
+                continue  # 新故事这次没抓到，下轮再试
+            story['seen_at'] = now
+            if not story.get('dead'):
+                stories.append(dict(story, id=story_id))
+    return stories
+
+
+def stats():
+    with _lock:
+        return dict(_counters)
+
+
+def print_stats():
+    counters = stats()
+    total = sum(counters.values())
+    if total:
+        print(f"\n🟧 HN 详情: {total} 条，缓存 {counters['cached']}，刷新分数 {counters['refreshed']}，新抓 {counters['fetched']}")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+共享 HTTP 客户端
+所有抓取模块统一走这里：长连接池（按域名复用）、统一代理/请求头/超时、自动重试
+"""
+
+import os
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from fetch_engine import host_slot, PER_HOST_LIMIT
+
+# 代理配置（NEWS_PROXY 设为空字符串可关闭代理）
+PROXY_URL = os.environ.get('NEWS_PROXY', 'http://127.0.0.1:1082')
+PROXY = {'http': PROXY_URL, 'https': PROXY_URL} if PROXY_URL else None
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+}
+DEFAULT_TIMEOUT = 15
+
+# 连接失败/限流/5xx 时自动重试，指数退避
+RETRY = Retry(
+    total=2,
+    connect=2,
+    read=1,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'HEAD']),
+    raise_on_status=False,
+)
+
+_session = None
+_session_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_session():
+    """全局共享的 Session，第一次使用时创建"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # pool_connections: 缓存多少个域名的连接池；pool_maxsize: 每个域名保留多少条长连接
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=PER_HOST_LIMIT, max_retries=RETRY)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
+
+
+def _record(host, elapsed, ok):
+    with _stats_lock:
+        stat = _stats.setdefault(host, {'requests': 0, 'errors': 0, 'elapsed': 0.0})
+        stat['requests'] += 1
+        stat['elapsed'] += elapsed
+        if not ok:
+            stat['errors'] += 1
+
+
+def get(url, headers=None, timeout=None, use_proxy=True, **kwargs):
+    """
+    发起 GET 请求
+    headers 会覆盖在默认请求头之上；use_proxy=False 时直连（GitHub Actions 里用）
+    """
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    t0 = time.time()
+    ok = False
+    try:
+        with host_slot(url):
+            response = get_session().get(
+                url,
+                headers=headers,
+                timeout=timeout or DEFAULT_TIMEOUT,
+                proxies=PROXY if use_proxy else None,
+                **kwargs
+            )
+        ok = response.status_code < 400
+        return response
+    finally:
+        _record(host, time.time() - t0, ok)
+
+
+def _pool_connections():
+    """统计每个连接池实际新建的连接数 {host: (新建连接数, 经过该池的请求数)}"""
+    counts = {}
+    session = get_session()
+    for adapter in set(session.adapters.values()):
+        managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+        for manager in managers:
+            for key in list(manager.pools.keys()):
+                try:
+                    pool = manager.pools[key]
+                except KeyError:
+                    continue
+                made, served = counts.get(pool.host, (0, 0))
+                counts[pool.host] = (made + pool.num_connections, served + pool.num_requests)
+    return counts
+
+
+def stats():
+    """每个域名的请求数、出错数、平均耗时和连接复用情况"""
+    pools = _pool_connections()
+    result = {}
+    with _stats_lock:
+        for host, stat in _stats.items():
+            hostname = host.split(':')[0]
+            connections, served = pools.get(hostname, (0, 0))
+            result[host] = {
+                'requests': stat['requests'],
+                'errors': stat['errors'],
+                'avg_ms': round(stat['elapsed'] / stat['requests'] * 1000) if stat['requests'] else 0,
+                'connections': connections,
+                'reused': max(served - connections, 0),
+            }
+    return result
+
+
+def print_stats():
+    """打印连接复用统计"""
+    result = stats()
+    if not result:
+        return
+    print("\n🔌 连接统计 (域名: 请求数 / 新建连接 / 复用 / 平均耗时)")
+    for host, stat in sorted(result.items(), key=lambda kv: -kv[1]['requests']):
+        errors = f" / ✗{stat['errors']}" if stat['errors'] else ""
+        print(f"   {host}: {stat['requests']} / {stat['connections']} / {stat['reused']} / {stat['avg_ms']}ms{errors}")
@@ -1,17 +1,25 @@
 #!/usr/bin/env python3
 """
-新闻封面图片获取 - 可靠方案
-1. 尝试抓取新闻网页的 og:image
-2. 失败时使用 Unsplash 随机图片（按分类）
+新闻封面图片获取 - 从便宜到贵依次尝试
+1. RSS 条目自带的图片（media:content / enclosure / 摘要里的 img）
+2. 新闻网页的 og:image（持久化缓存 + 限时并发抓取）
+3. 按标题主题匹配的 Unsplash 图库图片
 """
 
-import requests
+import codecs
+import json
+import os
 import re
+import threading
+import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
 from pathlib import Path
 
-# 代理配置
-PROXY = {'http': 'http://127.0.0.1:1082', 'https': 'http://127.0.0.1:1082'}
+import http_client
+from keyword_matcher import KeywordMatcher
+from url_canon import canonical_url
 
 # 主题关键词图片库 - 根据标题内容匹配
 TOPIC_IMAGES = {
@@ -116,36 +124,32 @@ TOPIC_IMAGES = {
 
 import hashlib
 
+# 配图主题关键词，按顺序匹配，第一个命中的主题生效
+TOPIC_KEYWORDS = {
+    '城市': ['城市', '建设', '规划', '新城', '嘉定', '南翔', '江桥', '安亭', '建筑', '楼盘'],
+    '科技': ['科技', '技术', '创新', '研发', '智能', '数字化', '互联网'],
+    'AI': ['AI', '人工智能', '大模型', 'ChatGPT', '机器学习', '算法', '神经网络'],
+    '金融': ['金融', '银行', '投资', '理财', '基金', '证券', '经济'],
+    '股票': ['股票', '股市', '股价', '涨跌', '特斯拉', 'TSLA', 'RKLB', 'PLTR'],
+    '医疗': ['医疗', '医院', '医生', '药物', '疫苗', '疾病', '健康', '医保'],
+    '健康': ['健康', '养生', '运动', '健身', '饮食', '营养'],
+    '教育': ['教育', '学校', '大学', '中学', '小学', '学生', '教师', '课程', '培训'],
+    '环境': ['环境', '生态', '绿色', '环保', '污染', '保护'],
+    '气候': ['气候', '天气', '气温', '降雨', '台风', '寒潮', '雾霾'],
+    '交通': ['交通', '出行', '公路', '高速', '道路', '驾驶', '车辆'],
+    '地铁': ['地铁', '轻轨', '轨道交通', '地铁线路'],
+    '企业': ['企业', '公司', '集团', '创业', '商业', 'vivo', '特斯拉', 'SpaceX'],
+    '商业': ['商业', '市场', '消费', '零售', '电商', '销售', '品牌'],
+    '政策': ['政策', '政府', '国务院', '工信部', '央行', '法规', '规定'],
+    '国际': ['国际', '全球', '世界', '美国', '欧洲', '日本', '联合国', '外交'],
+    '社区': ['社区', '街道', '居委会', '物业', '小区', '邻里', '便民'],
+    '养老': ['养老', '老人', '老龄化', '敬老院', '养老院', '长护险'],
+}
+TOPIC_MATCHER = KeywordMatcher(TOPIC_KEYWORDS)
+
 def match_topic(title):
     """根据标题匹配主题关键词"""
-    # 定义关键词映射
-    keywords_map = {
-        '城市': ['城市', '建设', '规划', '新城', '嘉定', '南翔', '江桥', '安亭', '建筑', '楼盘'],
-        '科技': ['科技', '技术', '创新', '研发', '智能', '数字化', '互联网'],
-        'AI': ['AI', '人工智能', '大模型', 'ChatGPT', '机器学习', '算法', '神经网络'],
-        '金融': ['金融', '银行', '投资', '理财', '基金', '证券', '经济'],
-        '股票': ['股票', '股市', '股价', '涨跌', '特斯拉', 'TSLA', 'RKLB', 'PLTR'],
-        '医疗': ['医疗', '医院', '医生', '药物', '疫苗', '疾病', '健康', '医保'],
-        '健康': ['健康', '养生', '运动', '健身', '饮食', '营养'],
-        '教育': ['教育', '学校', '大学', '中学', '小学', '学生', '教师', '课程', '培训'],
-        '环境': ['环境', '生态', '绿色', '环保', '污染', '保护'],
-        '气候': ['气候', '天气', '气温', '降雨', '台风', '寒潮', '雾霾'],
-        '交通': ['交通', '出行', '公路', '高速', '道路', '驾驶', '车辆'],
-        '地铁': ['地铁', '轻轨', '轨道交通', '地铁线路'],
-        '企业': ['企业', '公司', '集团', '创业', '商业', 'vivo', '特斯拉', 'SpaceX'],
-        '商业': ['商业', '市场', '消费', '零售', '电商', '销售', '品牌'],
-        '政策': ['政策', '政府', '国务院', '工信部', '央行', '法规', '规定'],
-        '国际': ['国际', '全球', '世界', '美国', '欧洲', '日本', '联合国', '外交'],
-        '社区': ['社区', '街道', '居委会', '物业', '小区', '邻里', '便民'],
-        '养老': ['养老', '老人', '老龄化', '敬老院', '养老院', '长护险'],
-    }
-    
-    title_lower = title.lower()
-    for topic, keywords in keywords_map.items():
-        for keyword in keywords:
-            if keyword in title_lower:
-                return topic
-    return 'default'
+    return TOPIC_MATCHER.first(title, default='default')
 
 def get_topic_image(title):
     """根据标题主题获取匹配的图片"""
@@ -155,70 +159,332 @@ def get_topic_image(title):
     index = int(hashlib.md5(title.encode()).hexdigest(), 16) % len(images)
     return images[index]
 
+# ---------- og:image 抓取 ----------
+
+OG_CACHE_FILE = Path(__file__).parent.parent / "data" / "cache" / "og_images.json"
+OG_CACHE_TTL = 7 * 86400          # 找到图片的结果保留 7 天
+OG_NEGATIVE_TTL = 86400           # 没找到/抓取失败的 1 天后再试
+OG_CACHE_MAX_ENTRIES = 5000
+OG_MAX_BYTES = 100 * 1024         # 最多读这么多还没读到 </head> 就放弃
+OG_TIMEOUT = 5
+OG_WORKERS = 8                    # 批量抓取的并发数（同域名还受 http_client 限流）
+OG_HEADERS = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
+# 按优先级排列：同一页面有多个时取最靠前的那种
+OG_META_KEYS = ('og:image', 'og:image:url', 'og:image:secure_url', 'twitter:image', 'twitter:image:src')
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class OgImageParser(HTMLParser):
+    """
+    边收数据边解析，记下 <head> 里优先级最高的 og/twitter 图片 meta（twitter:image 写在 og:image
+    前面也取 og:image）；看到最高优先级的 og:image、</head> 或 <body> 就停
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.image = None
+        self.rank = len(OG_META_KEYS)  # 当前 image 对应的键在 OG_META_KEYS 里的位置
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            self._stop()
+        if tag != 'meta':
+            return
+        attrs = dict(attrs)
+        key = (attrs.get('property') or attrs.get('name') or '').strip().lower()
+        content = (attrs.get('content') or '').strip()
+        if key in OG_META_KEYS and content and OG_META_KEYS.index(key) < self.rank:
+            self.image = content
+            self.rank = OG_META_KEYS.index(key)
+            if self.rank == 0:
+                self._stop()
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self._stop()
+
+    def _stop(self):
+        self.done = True
+        raise _StopParsing()
+
+    def feed_chunk(self, text):
+        """喂一段文本，返回是否已经可以停止"""
+        try:
+            self.feed(text)
+        except _StopParsing:
+            pass
+        return self.done
+
+
+class OgImageCache:
+    """文章链接（规范化后）-> (图片链接或 None, 写入时间)，没找到的结果也缓存，但过期更快"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def get(self, url):
+        """返回 (是否命中, 图片链接)；命中且图片为 None 表示之前确认过没有图"""
+        with self._lock:
+            record = self._entries.get(canonical_url(url))
+            if record:
+                image, stamp = record
+                ttl = OG_CACHE_TTL if image else OG_NEGATIVE_TTL
+                if time.time() - stamp < ttl:
+                    self.hits += 1
+                    return True, image
+            self.misses += 1
+            return False, None
+
+    def put(self, url, image):
+        with self._lock:
+            self._entries[canonical_url(url)] = (image, time.time())
+
+    def save(self):
+        with self._lock:
+            now = time.time()
+            entries = {key: record for key, record in self._entries.items()
+                       if now - record[1] < (OG_CACHE_TTL if record[0] else OG_NEGATIVE_TTL)}
+            if len(entries) > OG_CACHE_MAX_ENTRIES:
+                newest = sorted(entries.items(), key=lambda kv: kv[1][1])[-OG_CACHE_MAX_ENTRIES:]
+                entries = dict(newest)
+            self._entries = entries
+            # 后台抓取结束时也会存盘，写文件也放在锁里，免得两边同时写同一个临时文件
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.path.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.path)
+
+
+_og_cache = None
+_og_cache_lock = threading.Lock()
+
+
+def get_og_cache():
+    global _og_cache
+    with _og_cache_lock:
+        if _og_cache is None:
+            _og_cache = OgImageCache(OG_CACHE_FILE)
+        return _og_cache
+
+
+def _absolute(image_url, page_url):
+    """补全相对路径，非 http(s) 的返回 None"""
+    image_url = urllib.parse.urljoin(page_url, image_url.strip())
+    return image_url if image_url.startswith('http') else None
+
+
+def _scan_og_image(url):
+    """流式读取网页头部找 og:image，找不到返回 None"""
+    response = http_client.get(url, headers=OG_HEADERS, timeout=OG_TIMEOUT, stream=True)
+    try:
+        if response.status_code != 200:
+            return None
+        parser = OgImageParser()
+        # meta 里的链接基本是 ASCII，按 UTF-8 增量解码即可，坏字节忽略
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        received = 0
+        for chunk in response.iter_content(chunk_size=4096):
+            received += len(chunk)
+            if parser.feed_chunk(decoder.decode(chunk)) or received >= OG_MAX_BYTES:
+                break
+        return _absolute(parser.image, url) if parser.image else None
+    finally:
+        response.close()
+
+
 def fetch_og_image(url):
-    """从网页抓取 og:image（带缓存和超时）"""
+    """从网页抓取 og:image（先查持久化缓存；没找到的结果也缓存）"""
     if not url or not url.startswith('http'):
         return None
-    
+    cache = get_og_cache()
+    hit, image = cache.get(url)
+    if hit:
+        return image
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-        
-        # 限制时间和大小
-        response = requests.get(
-            url, 
-            headers=headers, 
-            timeout=5,  # 5秒超时
-            proxies=PROXY,
-            stream=True
-        )
-        
-        # 只读前50KB
-        content = b''
-        for chunk in response.iter_content(chunk_size=1024):
-            content += chunk
-            if len(content) > 50000:
-                break
-        
-        html = content.decode('utf-8', errors='ignore')
-        
-        # 查找 og:image
-        patterns = [
-            r'<meta[^\u003e]*property="og:image"[^\u003e]*content="([^"]+)"',
-            r'<meta[^\u003e]*content="([^"]+)"[^\u003e]*property="og:image"',
-            r'<meta[^\u003e]*name="twitter:image"[^\u003e]*content="([^"]+)"',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                image_url = match.group(1).strip()
-                # 处理相对路径
-                if image_url.startswith('//'):
-                    image_url = 'https:' + image_url
-                elif image_url.startswith('/'):
-                    parsed = urllib.parse.urlparse(url)
-                    image_url = f"{parsed.scheme}://{parsed.netloc}{image_url}"
-                
-                # 验证是合法URL
-                if image_url.startswith('http'):
-                    return image_url
-        
-        return None
-    except Exception as e:
-        return None
+        image = _scan_og_image(url)
+    except Exception:
+        image = None
+    cache.put(url, image)
+    return image
+
+
+def fetch_og_images(urls, max_workers=OG_WORKERS, budget=None):
+    """
+    批量抓取 og:image，返回 {url: (图片链接或 None, 耗时毫秒)}
+    缓存命中的不占并发名额，规范化后相同的链接只抓一次；
+    budget（秒）用完还没抓完的不出现在结果里，已发出的请求在后台跑完并写入缓存，
+    最后一个跑完时再把缓存存一次盘（一次性运行时主流程早已存过），下一轮直接命中
+    """
+    results = {}
+    pending = {}  # 规范化链接 -> 原链接列表
+    cache = get_og_cache()
+    for url in dict.fromkeys(urls):
+        if not url or not url.startswith('http'):
+            results[url] = (None, 0)
+            continue
+        hit, image = cache.get(url)
+        if hit:
+            results[url] = (image, 0)
+        else:
+            pending.setdefault(canonical_url(url), []).append(url)
+    if not pending:
+        return results
+
+    def timed_fetch(url):
+        t0 = time.time()
+        return fetch_og_image(url), int((time.time() - t0) * 1000)
+
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(pending)))
+    futures = {pool.submit(timed_fetch, group[0]): group for group in pending.values()}
+    done, not_done = wait(futures, timeout=budget)
+    if not_done:
+        remaining = [len(not_done)]
+        remaining_lock = threading.Lock()
+
+        def finished(_):
+            with remaining_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                save_og_cache()
+
+        # 排队还没开始的会被取消，也会触发回调
+        for future in not_done:
+            future.add_done_callback(finished)
+    pool.shutdown(wait=False, cancel_futures=True)
+    for future in done:
+        for url in futures[future]:
+            results[url] = future.result()
+    return results
+
+
+def save_og_cache():
+    if _og_cache is not None:
+        _og_cache.save()
+
+
+# ---------- 配图选择链：从便宜到贵 ----------
+
+# 每轮为联网抓 og:image 留的总时间（秒），超时的条目先用主题图，下一轮再补
+IMAGE_BUDGET = float(os.environ.get('NEWS_IMAGE_BUDGET', 10))
+
 
-def get_news_image(title, url, category='general'):
+def extract_image_from_entry(entry, source_url=''):
     """
-    获取新闻封面图片
-    1. 根据标题主题关键词匹配图片
-    2. 同一主题的新闻有不同的图片（基于标题hash）
+    从RSS条目中提取图片（多种策略，不需要联网）
     """
+    # 策略1：检查 media:content (最常见)
+    if 'media_content' in entry and entry.media_content:
+        for media in entry.media_content:
+            if media.get('medium') == 'image' or media.get('type', '').startswith('image'):
+                return media.get('url', '')
+
+    # 策略2：检查 media:thumbnail
+    if 'media_thumbnail' in entry and entry.media_thumbnail:
+        return entry.media_thumbnail[0].get('url', '')
+
+    # 策略3：检查 enclosures
+    if 'enclosures' in entry and entry.enclosures:
+        for enc in entry.enclosures:
+            if enc.get('type', '').startswith('image'):
+                return enc.get('href', '')
+
+    # 策略4：检查 summary/description 中的 img 标签
+    summary = entry.get('summary', entry.get('description', ''))
+    if summary:
+        img_match = re.search(r'<img[^>]+src=["\'](https?://[^"\']+)["\']', summary)
+        if img_match:
+            return img_match.group(1)
+    return ""
+
+
+def _set_image(item, url, image_type, elapsed_ms):
+    # 换了图，之前本地缩略图（image_proxy）的记录作废
+    item.pop('imageLocal', None)
+    item.pop('imageSrcset', None)
+    item['image'] = url
+    item['imageType'] = image_type
+    item['imageMs'] = elapsed_ms
+
+
+def resolve_images(items, budget=None):
+    """
+    为一组新闻选封面（原地修改），依次尝试：
+    1. entry —— RSS 条目自带的图片（解析时已经放在 item['image']）
+    2. og    —— og:image 缓存
+    3. og    —— 联网抓 og:image，所有条目共用 budget 秒
+    4. topic —— 按标题主题匹配的图库图片
+    已经是 entry/og 的条目跳过；记录 imageType 和 imageMs（这一步花的毫秒数）
+    返回各策略命中的条数
+    """
+    budget = IMAGE_BUDGET if budget is None else budget
+    counts = {'kept': 0, 'entry': 0, 'og_cached': 0, 'og_fetched': 0, 'topic': 0}
+    todo = []
+    for item in items:
+        if item.get('imageType') in ('entry', 'og'):
+            counts['kept'] += 1
+        elif item.get('image') and not item.get('imageType'):
+            _set_image(item, item['image'], 'entry', 0)
+            counts['entry'] += 1
+        else:
+            todo.append(item)
+
+    # 先只查缓存，没命中的再统一联网；缓存里确认过没有图的直接落到主题图
+    network = []
+    cache = get_og_cache()
+    for item in todo:
+        t0 = time.time()
+        hit, image = cache.get(item.get('link', '')) if item.get('link', '').startswith('http') else (True, None)
+        if hit and image:
+            _set_image(item, image, 'og', int((time.time() - t0) * 1000))
+            counts['og_cached'] += 1
+        elif not hit:
+            network.append(item)
+
+    fetched = fetch_og_images([item['link'] for item in network], budget=budget) if network else {}
+    for item in todo:
+        if item.get('imageType') == 'og':
+            continue
+        image, elapsed_ms = fetched.get(item.get('link', ''), (None, 0))
+        if image:
+            _set_image(item, image, 'og', elapsed_ms)
+            counts['og_fetched'] += 1
+        else:
+            t0 = time.time()
+            _set_image(item, get_topic_image(item['title']), 'topic', elapsed_ms + int((time.time() - t0) * 1000))
+            counts['topic'] += 1
+    return counts
+
+
+def get_news_image(title, url, category='general', prefer_real=False):
+    """
+    获取单条新闻的封面图片
+    prefer_real=True 时先试网页 og:image（有缓存），没有再按标题主题匹配图库图片；
+    同一主题的新闻有不同的图片（基于标题hash）
+    """
+    if prefer_real:
+        image_url = fetch_og_image(url)
+        if image_url:
+            return {'url': image_url, 'type': 'og'}
     # 根据标题主题匹配图片
     image_url = get_topic_image(title)
     return {'url': image_url, 'type': 'topic'}
 
+
 if __name__ == '__main__':
     # 测试
     test_cases = [
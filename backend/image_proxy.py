@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+本地图片代理 / 缩略图缓存
+每张封面只下载一次，按卡片尺寸生成 WebP + JPEG 缩略图，按内容哈希存到 frontend/img/，
+本地地址放在条目的 imageLocal / imageSrcset 里（image 始终是远程原图，页面加载本地图失败时退回用它）；
+总大小超限时按最近使用时间淘汰
+frontend/img/ 不进 git，只有页面和缩略图在同一台机器上提供时才有用，所以默认关闭，
+NEWS_IMAGE_PROXY=1 开启；依赖 Pillow，没装时不做任何处理
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import http_client
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+ROOT_DIR = Path(__file__).parent.parent
+IMAGE_DIR = ROOT_DIR / "frontend" / "img"
+INDEX_FILE = ROOT_DIR / "data" / "cache" / "image_proxy.json"
+URL_PREFIX = "img/"  # 相对 frontend/index.html
+
+ENABLED = os.environ.get('NEWS_IMAGE_PROXY', '0') == '1'
+# 卡片是 3:4 竖图，瀑布流 2~4 列，宽度大约 170~340px，再留出 2x 屏
+WIDTHS = (240, 360, 480)
+FALLBACK_WIDTH = 360                 # 不支持 WebP 时 <img src> 用的 JPEG
+ASPECT = 4 / 3                       # 高 / 宽
+WEBP_QUALITY = 78
+JPEG_QUALITY = 80
+MAX_SOURCE_BYTES = 8 * 1024 * 1024   # 原图超过这个大小不处理
+MAX_CACHE_BYTES = int(os.environ.get('NEWS_IMAGE_CACHE_MB', 200)) * 1024 * 1024
+MAX_IDLE = 14 * 86400                # 两周没被任何条目用到的图片直接删
+WORKERS = 4
+DOWNLOAD_TIMEOUT = 10
+
+_index = None  # 原图链接 -> {"hash", "bytes", "used"}
+_lock = threading.Lock()
+
+
+def available():
+    return ENABLED and Image is not None
+
+
+def _load_index():
+    global _index
+    if _index is None:
+        try:
+            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                _index = json.load(f)
+        except (OSError, ValueError):
+            _index = {}
+    return _index
+
+
+def _variant_path(digest, width, ext):
+    return IMAGE_DIR / digest[:2] / f"{digest}-{width}.{ext}"
+
+
+def _variant_url(digest, width, ext):
+    return f"{URL_PREFIX}{digest[:2]}/{digest}-{width}.{ext}"
+
+
+def _files_exist(digest):
+    return all(_variant_path(digest, width, 'webp').exists() for width in WIDTHS) \
+        and _variant_path(digest, FALLBACK_WIDTH, 'jpg').exists()
+
+
+def _render(data, digest):
+    """生成所有尺寸的缩略图，返回写入的总字节数"""
+    with Image.open(io.BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source).convert('RGB')
+        total = 0
+        for width in WIDTHS:
+            size = (width, round(width * ASPECT))
+            # 和前端 object-fit: cover 一样居中裁切
+            thumb = ImageOps.fit(source, size, Image.LANCZOS)
+            outputs = [('webp', {'quality': WEBP_QUALITY, 'method': 4})]
+            if width == FALLBACK_WIDTH:
+                outputs.append(('jpg', {'quality': JPEG_QUALITY, 'optimize': True, 'progressive': True}))
+            for ext, options in outputs:
+                path = _variant_path(digest, width, ext)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(f"{path.suffix}.{threading.get_ident()}.tmp")
+                thumb.save(tmp_path, 'WEBP' if ext == 'webp' else 'JPEG', **options)
+                os.replace(tmp_path, path)
+                total += path.stat().st_size
+        return total
+
+
+def _download(url):
+    response = http_client.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True)
+    try:
+        if response.status_code != 200:
+            return None
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > MAX_SOURCE_BYTES:
+                return None
+            chunks.append(chunk)
+        return b''.join(chunks)
+    finally:
+        response.close()
+
+
+def _localize_one(url):
+    """下载并生成缩略图，返回内容哈希；失败返回 None"""
+    try:
+        data = _download(url)
+        if not data:
+            return None
+        digest = hashlib.sha1(data).hexdigest()
+        size = 0 if _files_exist(digest) else _render(data, digest)
+    except Exception:
+        return None
+    with _lock:
+        _load_index()[url] = {"hash": digest, "bytes": size, "used": time.time()}
+    return digest
+
+
+def _apply(item, digest):
+    item['imageLocal'] = _variant_url(digest, FALLBACK_WIDTH, 'jpg')
+    item['imageSrcset'] = ', '.join(f"{_variant_url(digest, width, 'webp')} {width}w" for width in WIDTHS)
+
+
+def localize(items):
+    """
+    给条目的封面配上本地缩略图（原地修改）：imageLocal 指向 JPEG，imageSrcset 是各尺寸 WebP，
+    image 保持远程地址不变；处理不了的不带本地字段。返回 (本地命中数, 新下载数)
+    """
+    if not available():
+        return 0, 0
+    now = time.time()
+    todo = {}
+    reused = 0
+    with _lock:
+        index = _load_index()
+        for item in items:
+            origin = item.get('image')
+            if not origin or not origin.startswith('http'):
+                continue
+            record = index.get(origin)
+            if record and _files_exist(record['hash']):
+                record['used'] = now
+                _apply(item, record['hash'])
+                reused += 1
+            else:
+                # 缓存被淘汰了就先去掉本地字段，下载成功再加
+                item.pop('imageLocal', None)
+                item.pop('imageSrcset', None)
+                todo.setdefault(origin, []).append(item)
+
+    downloaded = 0
+    if todo:
+        with ThreadPoolExecutor(max_workers=min(WORKERS, len(todo))) as pool:
+            for origin, digest in zip(todo, pool.map(_localize_one, list(todo))):
+                if digest:
+                    downloaded += 1
+                    for item in todo[origin]:
+                        _apply(item, digest)
+    return reused, downloaded
+
+
+def evict():
+    """删掉很久没用的，再按最近使用时间从旧到新删，直到总大小不超过上限"""
+    with _lock:
+        index = _load_index()
+        now = time.time()
+        by_hash = {}
+        for url, record in index.items():
+            entry = by_hash.setdefault(record['hash'], {'bytes': 0, 'used': 0, 'urls': []})
+            entry['bytes'] = max(entry['bytes'], record['bytes'])
+            entry['used'] = max(entry['used'], record['used'])
+            entry['urls'].append(url)
+
+        total = sum(entry['bytes'] for entry in by_hash.values())
+        removed = 0
+        for digest, entry in sorted(by_hash.items(), key=lambda kv: kv[1]['used']):
+            if now - entry['used'] < MAX_IDLE and total <= MAX_CACHE_BYTES:
+                break
+            for width in WIDTHS:
+                for ext in ('webp', 'jpg'):
+                    try:
+                        _variant_path(digest, width, ext).unlink()
+                    except FileNotFoundError:
+                        pass
+            for url in entry['urls']:
+                del index[url]
+            total -= entry['bytes']
+            removed += 1
+        return removed
+
+
+def save():
+    with _lock:
+        if _index is None:
+            return
+        INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = INDEX_FILE.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(_index, f, ensure_ascii=False)
+        os.replace(tmp_file, INDEX_FILE)
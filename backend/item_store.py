@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+条目库（SQLite）
+按来源 + 条目 ID（见 url_canon.item_id）记住已经处理过（打分、翻译、配图、时间格式化）的条目，
+下一轮抓到同一条时直接复用，只对真正的新条目做处理
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DB_FILE = Path(__file__).parent.parent / "data" / "cache" / "items.db"
+RETENTION_DAYS = 30  # 超过这么久没再出现的条目会被清掉
+
+
+def key(source, item_id):
+    """库里的主键：来源 + 条目 ID（同一篇文章在不同来源的加工结果——前缀、翻译——可能不同，分开存）"""
+    return f"{source}\x1f{item_id}"
+
+
+def fingerprint(record):
+    """原始记录里决定处理结果的部分（标题、链接），变了就要重新处理"""
+    return hashlib.sha1(f"{record.get('title', '')}\x1f{record.get('link', '')}".encode("utf-8")).hexdigest()[:16]
+
+
+class ItemStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._saved = {}  # 主键 -> 上次写入的 JSON，没变化的不重复写
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS items (
+                id TEXT PRIMARY KEY,
+                category TEXT,
+                source TEXT,
+                fingerprint TEXT,
+                data TEXT,
+                first_seen REAL,
+                last_seen REAL
+            )
+        """)
+        self._conn.commit()
+
+    def get_many(self, keys):
+        """按主键批量查询 {key: {"item": dict, "fingerprint": str}}"""
+        if not keys:
+            return {}
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id, fingerprint, data FROM items WHERE id IN ({placeholders})", chunk
+                ).fetchall()
+                for row_id, row_fingerprint, data in rows:
+                    found[row_id] = {"item": json.loads(data), "fingerprint": row_fingerprint}
+                    self._saved.setdefault(row_id, data)
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def save(self, items, category=None, fingerprints=None, now=None):
+        """
+        写入/更新条目（item 需带 id 和 source）；fingerprints 按主键给
+        内容和上次写入相同的不重写，只刷新 last_seen（否则一直在的条目过了保留期会被 prune 删掉）
+        """
+        now = now or time.time()
+        rows = []
+        unchanged = []
+        with self._lock:
+            for item in items:
+                row_key = key(item.get("source"), item["id"])
+                data = json.dumps(item, ensure_ascii=False, sort_keys=True)
+                if self._saved.get(row_key) == data:
+                    unchanged.append((now, row_key))
+                    continue
+                self._saved[row_key] = data
+                rows.append((
+                    row_key, category, item.get("source"),
+                    (fingerprints or {}).get(row_key), data, now, now,
+                ))
+            if unchanged:
+                self._conn.executemany("UPDATE items SET last_seen = ? WHERE id = ?", unchanged)
+            if not rows:
+                self._conn.commit()
+                return 0
+            self._conn.executemany("""
+                INSERT INTO items (id, category, source, fingerprint, data, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    category = COALESCE(excluded.category, items.category),
+                    fingerprint = COALESCE(excluded.fingerprint, items.fingerprint),
+                    data = excluded.data,
+                    last_seen = excluded.last_seen
+            """, rows)
+            self._conn.commit()
+        return len(rows)
+
+    def prune(self, days=RETENTION_DAYS, now=None):
+        """删除很久没再出现过的条目"""
+        cutoff = (now or time.time()) - days * 86400
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM items WHERE last_seen < ?", (cutoff,))
+            self._conn.commit()
+            return cursor.rowcount
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """进程内共享的条目库"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ItemStore(DB_FILE)
+        return _store
+
+
+def remember(news_data):
+    """整份快照写回条目库（配图、后台翻译这些后补的结果也一起存下）"""
+    store = get_store()
+    for category, items in news_data.items():
+        store.save(items, category=category)
+
+
+def print_stats():
+    if _store is not None and (_store.hits or _store.misses):
+        print(f"\n♻️ 条目库: 复用 {_store.hits} 条，新处理 {_store.misses} 条")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+多组关键词匹配
+把所有关键词编译成一个 Aho-Corasick 自动机，对文本只扫一遍就能知道命中了哪些组；
+相关度打分（嘉定/节气/社区）和配图主题匹配共用。
+实测（python backend/keyword_matcher.py，5 万条合成标题，多次运行）：配图主题约 2.9~3.2x；
+相关度打分只有约 1.0~1.5x，关键词少（50 多个），旧实现的 in 在 C 里跑，逐字走自动机的 Python 循环省不了多少
+"""
+
+import random
+import time
+from collections import deque
+
+# 嘉定/节气/社区关键词（原先 sources、shanghai_fetcher、fetch_news_simple 各有一份，取并集）
+SHANGHAI_KEYWORDS = {
+    # 嘉定相关
+    'jiading': ['嘉定', '南翔', '江桥', '安亭', '马陆', '外冈', '徐行', '华亭', '菊园', '新成路', '真新',
+                '嘉定新城', '嘉定工业区', '州桥', '法华塔'],
+    # 节气时令
+    'season': ['立春', '雨水', '惊蛰', '春分', '清明', '谷雨', '立夏', '小满', '芒种', '夏至', '小暑', '大暑',
+               '立秋', '处暑', '白露', '秋分', '寒露', '霜降', '立冬', '小雪', '大雪', '冬至', '小寒', '大寒'],
+    # 社区民生
+    'community': ['社区', '街道', '居委会', '业委会', '物业', '邻里', '便民', '为老', '养老', '托育', '菜场',
+                  '旧改', '加装电梯', '长护险', '医保'],
+}
+SHANGHAI_WEIGHTS = {'jiading': 3, 'season': 2, 'community': 1}
+
+
+class KeywordMatcher:
+    """
+    groups: {组名: [关键词, ...]}，组的顺序即优先级（first() 返回最靠前的命中组）
+    匹配不区分大小写；同一个关键词可以出现在多个组里
+    """
+
+    def __init__(self, groups):
+        self.names = list(groups)
+        goto = [{}]
+        output = [0]  # 每个状态命中的组，按位存
+        for index, name in enumerate(self.names):
+            for keyword in groups[name]:
+                state = 0
+                for char in keyword.lower():
+                    nxt = goto[state].get(char)
+                    if nxt is None:
+                        goto.append({})
+                        output.append(0)
+                        nxt = len(goto) - 1
+                        goto[state][char] = nxt
+                    state = nxt
+                output[state] |= 1 << index
+
+        # 按层序求失配指针，顺带把失配链上的输出合并进来，并展开成完整的转移表，
+        # 这样扫描时每个字符只查一次字典，不用沿失配链回退
+        fail = [0] * len(goto)
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            for char, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(char, 0)
+                output[nxt] |= output[fail[nxt]]
+                queue.append(nxt)
+        self._delta = delta
+        self._output = output
+
+    def mask(self, *texts):
+        """命中组的位掩码（第 i 位对应第 i 个组）；多段文本分别扫描，不会跨段拼出关键词"""
+        delta = self._delta
+        output = self._output
+        hits = 0
+        for text in texts:
+            state = 0
+            for char in text.lower():
+                state = delta[state].get(char, 0)
+                hits |= output[state]
+        return hits
+
+    def match(self, *texts):
+        """命中的组名集合"""
+        hits = self.mask(*texts)
+        return {name for index, name in enumerate(self.names) if hits >> index & 1}
+
+    def first(self, *texts, default=None):
+        """优先级最高的命中组，没有命中返回 default"""
+        hits = self.mask(*texts)
+        if not hits:
+            return default
+        return self.names[(hits & -hits).bit_length() - 1]
+
+
+SHANGHAI_MATCHER = KeywordMatcher(SHANGHAI_KEYWORDS)
+
+
+def is_shanghai_relevant(title, summary=""):
+    """判断是否与嘉定/节气/社区相关（标题和摘要一起看）"""
+    hits = SHANGHAI_MATCHER.match(title, summary)
+    result = {name: name in hits for name in SHANGHAI_KEYWORDS}
+    result['score'] = sum(SHANGHAI_WEIGHTS[name] for name in hits)
+    return result
+
+
+def _legacy_is_shanghai_relevant(title, summary=""):
+    """旧实现（每组一次 any(kw in text)），只用于下面的基准对比"""
+    text = (title + summary).lower()
+    hits = {name for name, keywords in SHANGHAI_KEYWORDS.items() if any(kw in text for kw in keywords)}
+    return {'score': sum(SHANGHAI_WEIGHTS[name] for name in hits)}
+
+
+def _legacy_first(groups, text):
+    """旧的主题匹配：逐组逐词 in（关键词也转小写，否则和新实现结果不可比）"""
+    text = text.lower()
+    for name, keywords in groups.items():
+        for keyword in keywords:
+            if keyword.lower() in text:
+                return name
+    return 'default'
+
+
+def benchmark(count=50000, seed=1):
+    """用随机合成的标题语料对比新旧实现的耗时，并检查结果一致"""
+    from image_handler import TOPIC_KEYWORDS, TOPIC_MATCHER
+
+    rng = random.Random(seed)
+    chars = [chr(code) for code in range(0x4e00, 0x4e00 + 3000)] + list('abcdefghijklmnopqrstuvwxyz ')
+    keywords = [kw for group in (SHANGHAI_KEYWORDS, TOPIC_KEYWORDS) for kws in group.values() for kw in kws]
+    corpus = []
+    for _ in range(count):
+        title = ''.join(rng.choice(chars) for _ in range(rng.randint(12, 40)))
+        for _ in range(rng.choice([0, 0, 1, 2])):  # 约一半标题带关键词
+            pos = rng.randint(0, len(title))
+            title = title[:pos] + rng.choice(keywords) + title[pos:]
+        corpus.append(title)
+
+    cases = [
+        ("相关度打分", lambda t: _legacy_is_shanghai_relevant(t)['score'], lambda t: is_shanghai_relevant(t)['score']),
+        ("配图主题", lambda t: _legacy_first(TOPIC_KEYWORDS, t), lambda t: TOPIC_MATCHER.first(t, default='default')),
+    ]
+    print(f"📏 合成语料 {count} 条标题")
+    for label, old, new in cases:
+        t0 = time.perf_counter()
+        old_results = [old(title) for title in corpus]
+        t1 = time.perf_counter()
+        new_results = [new(title) for title in corpus]
+        t2 = time.perf_counter()
+        same = "一致" if old_results == new_results else "不一致"
+        print(f"   {label}: 旧 {t1 - t0:.3f}s，新 {t2 - t1:.3f}s（{(t1 - t0) / (t2 - t1):.1f}x），结果{same}")
+
+
+if __name__ == "__main__":
+    benchmark()
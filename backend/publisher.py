@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+快照发布
+只序列化一次（紧凑 JSON），用"写临时文件 + 原子替换"写到每个目标位置，
+同时生成预压缩的 .gz / .br 和内容哈希 .sha256，读的一方永远看不到写了一半的文件；
+去掉易变字段后内容和上次发布的一样时整个跳过（不写文件、不触发下游）
+另外按分类拆成分片 frontend/shards/<分类>.<哈希>.json（文件名带内容哈希，可以永久缓存），
+frontend/manifest.json 记录每个分片的文件名、哈希和条数，页面先取清单再按需取分片；
+每次发布版本号加一并写一份相对上一版的增量（见 deltas.py），增量更新全文检索索引（见 search_index.py），
+新条目追加到按天分的历史归档（见 archive.py）
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT_DIR = Path(__file__).parent.parent
+# 实时版/简化版的输出位置：data/news.json 给 API，frontend/data.json 给页面，根目录 data.json 给静态部署
+DEFAULT_TARGETS = (
+    ROOT_DIR / "data" / "news.json",
+    ROOT_DIR / "frontend" / "data.json",
+    ROOT_DIR / "data.json",
+)
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+# 分片和清单的根目录（相对它的 shards/ 和 manifest.json），None 表示不出分片
+SHARD_ROOT = ROOT_DIR / "frontend"
+SHARD_DIR_NAME = "shards"
+MANIFEST_NAME = "manifest.json"
+SHARD_HASH_LENGTH = 8
+# 不再被清单引用的旧分片保留一段时间，还拿着旧清单的页面仍能取到
+SHARD_GRACE = 3600
+
+# 增量目录（见 deltas.py），None 表示不记版本和增量
+DELTA_DIR = ROOT_DIR / "data" / "deltas"
+# 全文检索索引（见 search_index.py），None 表示不更新
+SEARCH_INDEX_FILE = ROOT_DIR / "data" / "search_index.json"
+# 历史归档目录（见 archive.py），None 表示不归档
+ARCHIVE_DIR = ROOT_DIR / "data" / "archive"
+
+# 本地缩略图字段（见 image_proxy.py）里是相对 frontend/ 的地址，只有 frontend/ 下的文件保留，
+# 其他位置（API、根目录页面）、增量、检索索引和归档都去掉，只用远程 image
+LOCAL_ROOT = ROOT_DIR / "frontend"
+LOCAL_KEYS = frozenset({'imageLocal', 'imageSrcset'})
+
+STATE_FILE = ROOT_DIR / "data" / "cache" / "publish_state.json"
+# 每轮都会变、但不代表内容有更新的字段：相对时间/"今日"、是否 24 小时内、配图耗时、Reddit/HN 的票数和评论数
+VOLATILE_KEYS = frozenset({'time', 'isNew', 'imageMs', 'votes', 'comments'})
+
+
+def atomic_write(path, data):
+    """先写同目录下的临时文件再替换，替换是原子的"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+
+def serialize(data):
+    """紧凑 JSON（UTF-8 字节）"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode(body):
+    """返回 {后缀: 内容}：原文、.gz、.br（装了 brotli 才有）"""
+    variants = {'': body, '.gz': gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return variants
+
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {key: _strip_volatile(item) for key, item in value.items() if key not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(item) for item in value]
+    return value
+
+
+def strip_local(data):
+    """去掉本地缩略图字段后的副本（没有这些字段时原样返回）"""
+    has_local = any(key in item for items in data.values() if isinstance(items, list)
+                    for item in items for key in LOCAL_KEYS)
+    if not has_local:
+        return data
+    return {category: [{key: value for key, value in item.items() if key not in LOCAL_KEYS} for item in items]
+            if isinstance(items, list) else items
+            for category, items in data.items()}
+
+
+def _serves_local(path):
+    """这个位置的文件是不是和 frontend/img/ 一起提供（相对地址能用）"""
+    try:
+        Path(path).resolve().relative_to(LOCAL_ROOT.resolve())
+        return True
+    except ValueError:
+        return False
+
+
+def content_hash(data):
+    """去掉易变字段后的规范化哈希（键排序），用来判断内容有没有真的变化"""
+    canonical = json.dumps(_strip_volatile(data), ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _load_state():
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state):
+    atomic_write(STATE_FILE, json.dumps(state, ensure_ascii=False, indent=2).encode('utf-8'))
+
+
+def _previous_content(target):
+    """上次发布的内容哈希；没有状态文件（如 CI 里全新检出）时直接读已发布的文件算"""
+    record = _load_state().get(str(target))
+    if record:
+        return record.get('content')
+    try:
+        with open(target, 'r', encoding='utf-8') as f:
+            return content_hash(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_variants(target, variants):
+    """先写压缩版本再写原文；没装 brotli 时删掉旧的 .br，免得和原文对不上"""
+    for suffix in ('.gz', '.br'):
+        sibling = target.with_name(target.name + suffix)
+        if suffix in variants:
+            atomic_write(sibling, variants[suffix])
+        elif sibling.exists():
+            sibling.unlink()
+    atomic_write(target, variants[''])
+
+
+def _load_manifest(shard_root):
+    try:
+        with open(Path(shard_root) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _clean_shards(shard_dir, referenced):
+    """删掉没被清单引用、且超过保留期的旧分片（连同 .gz/.br）"""
+    cutoff = time.time() - SHARD_GRACE
+    removed = 0
+    for path in shard_dir.iterdir():
+        base = path.name
+        for suffix in ('.gz', '.br'):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if base in referenced or base.startswith('.'):
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def write_shards(data, shard_root=SHARD_ROOT):
+    """
+    按分类写分片和清单，返回清单。内容（忽略易变字段）没变的分类沿用上次的分片文件，
+    只有变了的分类换新文件名；清单在所有分片写完之后才替换
+    """
+    shard_root = Path(shard_root)
+    shard_dir = shard_root / SHARD_DIR_NAME
+    previous = _load_manifest(shard_root).get('shards', {})
+    shards = {}
+    meta = {}
+    for category, items in data.items():
+        if not isinstance(items, list):
+            meta[category] = items  # 非列表字段（如更新时间）直接放进清单
+            continue
+        content = content_hash(items)
+        old = previous.get(category)
+        if old and old.get('content') == content and (shard_root / old['file']).exists():
+            shards[category] = old
+            continue
+        body = serialize(items)
+        digest = hashlib.sha256(body).hexdigest()
+        name = f"{category}.{digest[:SHARD_HASH_LENGTH]}.json"
+        path = shard_dir / name
+        if not path.exists():
+            _write_variants(path, encode(body))
+        shards[category] = {
+            "file": f"{SHARD_DIR_NAME}/{name}",
+            "sha256": digest,
+            "content": content,
+            "count": len(items),
+            "bytes": len(body),
+        }
+
+    manifest = {"generated": int(time.time()), "shards": shards}
+    if meta:
+        manifest["meta"] = meta
+    atomic_write(shard_root / MANIFEST_NAME, serialize(manifest))
+    if shard_dir.exists():
+        _clean_shards(shard_dir, {Path(shard['file']).name for shard in shards.values()})
+    return manifest
+
+
+def _load_published(target):
+    try:
+        with open(target, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def publish(data, targets=DEFAULT_TARGETS, force=False, shard_root=SHARD_ROOT, delta_dir=DELTA_DIR,
+            index_file=SEARCH_INDEX_FILE, archive_dir=ARCHIVE_DIR):
+    """
+    把数据发布到所有目标位置，返回 {"published", "content", "sha256", "bytes", "gz", "br", "shards", "version"}
+    内容（忽略易变字段）和上次一样且文件（含清单）都在时不写，published 为 False
+    每个目标先写压缩版本，再写原文，最后写 .sha256；shard_root 不为 None 时再写分片和清单，
+    delta_dir 不为 None 时和第一个目标上次的内容比对，写出增量并把版本号加一；
+    index_file 不为 None 时把新条目加进检索索引；archive_dir 不为 None 时把新条目追加到历史归档
+    """
+    targets = [Path(target) for target in targets]
+    content = content_hash(data)
+    files = list(targets)
+    if shard_root is not None:
+        files.append(Path(shard_root) / MANIFEST_NAME)
+    if not force and content == _previous_content(targets[0]) and all(path.exists() for path in files):
+        return {"published": False, "content": content}
+
+    previous = _load_published(targets[0]) if delta_dir is not None else None
+    plain = strip_local(data)
+    encoded = {}  # 是否带本地字段 -> (原文, sha256, 各压缩版本)
+    for target in targets:
+        local = plain is not data and _serves_local(target)
+        if local not in encoded:
+            body = serialize(data if local else plain)
+            encoded[local] = (body, hashlib.sha256(body).hexdigest(), encode(body))
+        body, digest, variants = encoded[local]
+        _write_variants(target, variants)
+        atomic_write(target.with_name(target.name + '.sha256'), f"{digest}\n".encode('ascii'))
+    body, digest, variants = encoded[plain is not data and _serves_local(targets[0])]
+    manifest = None
+    if shard_root is not None:
+        manifest = write_shards(data if _serves_local(shard_root) else plain, shard_root)
+    version = None
+    if delta_dir is not None:
+        import deltas  # deltas 依赖本模块，用到时才导入
+        version = deltas.record(previous, plain, delta_dir)
+    indexed = None
+    if index_file is not None:
+        import search_index  # 同样依赖本模块
+        indexed = search_index.update(plain, index_file)
+    archived = None
+    if archive_dir is not None:
+        import archive  # 同样依赖本模块
+        archived = archive.append(plain, archive_dir)
+
+    state = _load_state()
+    state[str(targets[0])] = {"content": content, "sha256": digest, "published_at": time.time()}
+    _save_state(state)
+    return {
+        "published": True,
+        "content": content,
+        "sha256": digest,
+        "bytes": len(body),
+        "gz": len(variants['.gz']),
+        "br": len(variants['.br']) if '.br' in variants else None,
+        "shards": manifest['shards'] if manifest else None,
+        "version": version,
+        "indexed": indexed,
+        "archived": archived,
+    }
+
+
+def describe(result):
+    """发布结果的一行说明"""
+    if not result['published']:
+        return f"内容没变化，跳过发布（{result['content'][:12]}）"
+    sizes = f"{result['bytes'] / 1024:.0f}KB，gzip {result['gz'] / 1024:.0f}KB"
+    if result['br'] is not None:
+        sizes += f"，br {result['br'] / 1024:.0f}KB"
+    if result.get('version'):
+        sizes = f"v{result['version']}，{sizes}"
+    if result.get('shards'):
+        sizes += f"，{len(result['shards'])} 个分片"
+    if result.get('indexed'):
+        sizes += f"，索引新增 {result['indexed'][0]} 删除 {result['indexed'][1]}"
+    if result.get('archived'):
+        sizes += f"，归档 {result['archived']} 条"
+    return f"{sizes}，sha256 {result['sha256'][:12]}"
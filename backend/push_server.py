@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+新条目推送（Server-Sent Events）
+单个 asyncio 事件循环：盯着增量索引 data/deltas/index.json，每出一个新版本就把那份增量
+原样作为一条事件推给所有连着的页面；定时发心跳防止代理断开空闲连接；
+断线重连时按 Last-Event-ID（即页面手里的版本号）补发期间的变化，太旧时让页面重新拉快照。
+每个连接只占一个等待读结束的协程和一个写缓冲，几千个空闲连接的开销很小
+
+用法: python backend/push_server.py  （端口 NEWS_PUSH_PORT，默认 8765；页面连 /events）
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).parent))
+import deltas
+
+HOST = os.environ.get('NEWS_PUSH_HOST', '0.0.0.0')
+PORT = int(os.environ.get('NEWS_PUSH_PORT', 8765))
+EVENTS_PATH = '/events'
+WATCH_INTERVAL = 1.0         # 多久看一次增量索引有没有变（只 stat 一个文件）
+HEARTBEAT_INTERVAL = 15      # 心跳间隔，要比常见代理的空闲超时（30~60 秒）短
+RETRY_MS = 5000              # 告诉浏览器断线后多久重连
+MAX_BUFFER = 256 * 1024      # 写缓冲积压超过这么多的慢客户端直接断开
+REQUEST_TIMEOUT = 10         # 读请求头的超时
+
+
+def event(name, data, event_id=None):
+    """编码一条 SSE 事件；data 是已经序列化好的 JSON 字节"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {name}\n".encode('utf-8') + b"data: " + data + b"\n\n"
+
+
+def _json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class PushServer:
+    def __init__(self, delta_dir=deltas.DELTA_DIR):
+        self.delta_dir = Path(delta_dir)
+        self.clients = set()   # StreamWriter
+        self.version = deltas.load_index(self.delta_dir)['version']
+        self.sent = 0          # 推出去的版本数
+
+    # ---- 广播 ----
+
+    def broadcast(self, payload):
+        """同一份字节写给所有客户端；积压太多的断开"""
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_BUFFER:
+                self._drop(writer)
+                continue
+            try:
+                writer.write(payload)
+            except (ConnectionError, RuntimeError):
+                self._drop(writer)
+
+    def _drop(self, writer):
+        self.clients.discard(writer)
+        writer.close()
+
+    async def watch(self):
+        """增量索引的 mtime/大小变了就读一次，把新版本的增量逐个推出去"""
+        index_file = self.delta_dir / deltas.INDEX_NAME
+        last_key = None
+        while True:
+            try:
+                stat = index_file.stat()
+                key = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                key = None
+            if key is not None and key != last_key:
+                last_key = key
+                self.publish_new_versions()
+            await asyncio.sleep(WATCH_INTERVAL)
+
+    def publish_new_versions(self):
+        index = deltas.load_index(self.delta_dir)
+        current = index['version']
+        if current < self.version:
+            # 版本号被重置（增量目录被清空过），让所有页面重新拉快照
+            self.broadcast(event('reset', _json({"version": current}), current))
+        for number in range(max(self.version + 1, index.get('oldest', 1)), current + 1):
+            try:
+                with open(self.delta_dir / f"{number}.json", 'rb') as f:
+                    payload = f.read()
+            except OSError:
+                continue
+            self.broadcast(event('delta', payload, number))
+            self.sent += 1
+            print(f"📣 v{number} 推送给 {len(self.clients)} 个连接")
+        self.version = current
+
+    async def heartbeat(self):
+        ping = b": ping\n\n"
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            self.broadcast(ping)
+
+    # ---- 连接 ----
+
+    async def _read_request(self, reader):
+        """读请求行和请求头，返回 (路径, 查询参数, 请求头)"""
+        request_line = await reader.readline()
+        parts = request_line.decode('latin-1').split()
+        if len(parts) < 2:
+            return None, {}, {}
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        url = urlsplit(parts[1])
+        return url.path, parse_qs(url.query), headers
+
+    def _catch_up(self, last_id):
+        """重连时要补发的事件：Last-Event-ID 之后的变化合成一条；接不上时发 reset"""
+        if last_id is None or last_id == self.version:
+            return b""
+        version, delta = deltas.since(last_id, self.delta_dir)
+        if version > self.version:
+            # 监视协程还没看到最新版本：先推给已有连接，免得这个连接之后再收到一遍
+            self.publish_new_versions()
+        if delta is None:
+            return event('reset', _json({"version": version}), version)
+        return event('delta', _json(delta), version)
+
+    async def handle(self, reader, writer):
+        try:
+            path, query, headers = await asyncio.wait_for(self._read_request(reader), REQUEST_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError, UnicodeDecodeError):
+            writer.close()
+            return
+        if path != EVENTS_PATH:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            writer.close()
+            return
+
+        # EventSource 重连时带 Last-Event-ID 头；第一次连接可以用 ?since=版本号
+        last_id = headers.get('last-event-id') or (query.get('since') or [None])[0]
+        try:
+            last_id = int(last_id) if last_id is not None else None
+        except ValueError:
+            last_id = None
+
+        catch_up = self._catch_up(last_id)
+        # hello 也带 id：连上后还没等到第一条增量就断开的页面，重连时靠它带回 Last-Event-ID；
+        # 后面紧跟补发事件时用页面自己的版本，等补发事件再更新，免得中途断开漏掉补发
+        hello_id = last_id if catch_up else self.version
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream; charset=utf-8\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: keep-alive\r\n"
+            b"Access-Control-Allow-Origin: *\r\n"
+            b"X-Accel-Buffering: no\r\n"
+            b"\r\n"
+            + f"retry: {RETRY_MS}\n\n".encode('ascii')
+            + event('hello', _json({"version": self.version}), hello_id)
+            + catch_up
+        )
+        self.clients.add(writer)
+        try:
+            # 客户端不会再发东西，读到 EOF 就是断开了
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self._drop(writer)
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        print(f"📡 推送服务已启动: http://{host}:{port}{EVENTS_PATH}（当前 v{self.version}）")
+        started = time.time()
+        async with server:
+            tasks = [asyncio.ensure_future(self.watch()), asyncio.ensure_future(self.heartbeat())]
+            try:
+                await server.serve_forever()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                print(f"📡 推送服务停止，运行 {(time.time() - started) / 60:.0f} 分钟，共推送 {self.sent} 个版本")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(PushServer().serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+常驻调度器 - 替代每5分钟整轮重抓
+每个源单独计时：更新快的源缩短轮询间隔，长时间没有新内容的源逐步放慢（在上下限之间），
+任何源出现新条目时重新合并并发布快照
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import archive
+import feed_cache
+import hn_client
+import item_store
+import publisher
+import sources
+import translator
+from sources import SOURCES, CATEGORIES, run_sources, build_category
+from fetch_news_realtime import add_images, save_snapshot, finish_translation
+
+STATE_FILE = Path(__file__).parent.parent / "data" / "cache" / "scheduler.json"
+
+MIN_INTERVAL = 60          # 最快 1 分钟一次
+MAX_INTERVAL = 4 * 3600    # 最慢 4 小时一次
+TARGET_NEW_ITEMS = 2       # 希望每次轮询平均能拿到几条新内容
+BACKOFF = 1.5              # 没有新内容时间隔放大倍数
+FAILURE_BACKOFF = 2        # 请求失败时间隔放大倍数
+SMOOTHING = 0.5            # 更新速率的指数平滑系数
+SEEN_LIMIT = 300           # 每个源记住最近多少条，用来判断是不是新条目
+TICK = 5                   # 调度循环最长休眠秒数
+
+
+def item_key(item):
+    return item['id']
+
+
+def load_state():
+    """读取上次的调度状态，新增的源用配置表里的初始间隔"""
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+
+    state = {}
+    for src in SOURCES:
+        record = saved.get(src["name"], {})
+        state[src["name"]] = {
+            "interval": record.get("interval", src.get("interval", sources.DEFAULT_INTERVAL)),
+            "rate": record.get("rate"),          # 平滑后的新条目速率（条/秒）
+            "last_run": None,
+            "next_due": 0,                       # 启动时全部先抓一次
+            "seen": record.get("seen", []),
+        }
+    return state
+
+
+def save_state(state):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        name: {"interval": s["interval"], "rate": s["rate"], "seen": s["seen"][-SEEN_LIMIT:]}
+        for name, s in state.items()
+    }
+    tmp_file = STATE_FILE.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_file, STATE_FILE)
+
+
+def adapt_interval(record, new_count, ok, now):
+    """根据这次拿到的新条目数调整下次轮询间隔"""
+    interval = record["interval"]
+    if not ok:
+        interval *= FAILURE_BACKOFF
+    elif record["last_run"] is not None or record["rate"] is not None:
+        elapsed = now - record["last_run"] if record["last_run"] else interval
+        observed = new_count / max(elapsed, 1)
+        rate = observed if record["rate"] is None else SMOOTHING * observed + (1 - SMOOTHING) * record["rate"]
+        record["rate"] = rate
+        if new_count > 0 and rate > 0:
+            # 按当前速率，大约攒够 TARGET_NEW_ITEMS 条再来
+            interval = TARGET_NEW_ITEMS / rate
+        else:
+            interval *= BACKOFF
+    record["interval"] = min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+    record["last_run"] = now
+    record["next_due"] = now + record["interval"]
+
+
+def requests_per_hour(state):
+    return sum(3600 / s["interval"] for name, s in state.items()
+               if sources.SOURCES_BY_NAME[name]["kind"] != "static")
+
+
+def run_due(due, state, results):
+    """抓取到期的源，更新间隔；返回这轮一共有多少条新内容"""
+    fetched = run_sources(due)
+    run_stats = sources.stats()
+    now = time.time()
+    total_new = 0
+
+    for src in due:
+        name = src["name"]
+        record = state[name]
+        items = fetched.get(name, [])
+        ok = run_stats.get(name, {}).get("ok", False)
+        seen = set(record["seen"])
+        new_keys = [item_key(item) for item in items if item_key(item) not in seen]
+        # 首次运行（没有历史）时所有条目都算"新"，不计入速率
+        first_run = not record["seen"] and record["last_run"] is None
+
+        adapt_interval(record, len(new_keys), ok, now)
+        record["seen"] = (record["seen"] + new_keys)[-SEEN_LIMIT:]
+        if ok or name not in results:
+            results[name] = items
+        if not first_run:
+            total_new += len(new_keys)
+        print(f"   {name}: 新 {len(new_keys)} 条，下次 {record['interval'] / 60:.1f} 分钟后")
+    return total_new
+
+
+def publish(results):
+    news_data = {category: build_category(category, results) for category in CATEGORIES}
+    add_images(news_data)
+    item_store.remember(news_data)
+    published = save_snapshot(news_data)
+    if published['published']:
+        print(f"💾 已发布: {sum(len(v) for v in news_data.values())} 条（{publisher.describe(published)}）")
+    else:
+        print(f"😴 {publisher.describe(published)}")
+    finish_translation(news_data)
+
+
+def maintain_if_due(last_day, today=None, archive_dir=archive.ARCHIVE_DIR):
+    """
+    每天的维护（条目库清理、归档删过期和压实）：日期变了（含刚启动）才跑，返回这次看到的日期，
+    调用方存下来下次传回；常驻进程一直不退出，不能只在启动时跑一次
+    """
+    today = today or date.today()
+    if today != last_day:
+        pruned = item_store.get_store().prune()
+        if pruned:
+            print(f"♻️ 条目库: 清理 {pruned} 条过期条目")
+        archive.maintain(archive_dir, today)
+    return today
+
+
+def run_forever(defer_translation=True):
+    print("🚀 启动常驻调度器...")
+    translator.set_deferred(defer_translation)
+    state = load_state()
+    results = {}
+    published = False
+    maintained_day = None
+
+    try:
+        while True:
+            maintained_day = maintain_if_due(maintained_day)
+            now = time.time()
+            due = [src for src in SOURCES if state[src["name"]]["next_due"] <= now]
+            if due:
+                print(f"\n⏰ {datetime.now().strftime('%H:%M:%S')} - 抓取 {len(due)} 个源")
+                new_count = run_due(due, state, results)
+                if new_count or not published:
+                    publish(results)
+                    published = True
+                else:
+                    print("😴 没有新内容，不重新发布")
+                save_state(state)
+                feed_cache.save()
+                hn_client.save()
+                item_store.print_stats()
+                print(f"📉 预计每小时轮询 {requests_per_hour(state):.0f} 次")
+
+            next_due = min(s["next_due"] for s in state.values())
+            time.sleep(min(max(next_due - time.time(), 0.5), TICK))
+    except KeyboardInterrupt:
+        print("\n👋 停止调度，保存状态")
+        save_state(state)
+        feed_cache.save()
+        hn_client.save()
+        translator.save_cache()
+
+
+if __name__ == "__main__":
+    run_forever(defer_translation='--no-defer-translate' not in sys.argv)
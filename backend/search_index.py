@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+全文检索索引
+发布时把标题和摘要切成中文单字 + 二元组、英文/数字单词，建倒排索引存到 data/search_index.json；
+每轮只给新条目（或标题/摘要变了的条目）切词，过期条目从索引里删掉，不整体重建。
+不只覆盖当前快照，最近两周出现过的条目都能搜到。
+存盘是整个文件重写（原子替换）：上限 5000 条时文件只有几 MB，重写比分段存倒排、
+查询时再拼起来简单，读的一方（api/search.py）也只要整体读一次；切词这种贵的部分才做增量。
+进程里缓存着加载好的索引，文件被别的进程（比如常驻调度器运行时手动跑一次抓取）改写过就重新加载
+"""
+
+import json
+import math
+import re
+import threading
+import time
+from pathlib import Path
+
+from publisher import SEARCH_INDEX_FILE as INDEX_FILE, atomic_write, serialize
+from url_canon import item_id
+
+RETENTION_DAYS = 14    # 超过这么久没再出现在快照里的条目从索引里删掉
+MAX_DOCS = 5000        # 条目数上限，超出时先删最久没出现的
+TITLE_WEIGHT = 3       # 标题里的词比摘要里的重要
+SUMMARY_CHARS = 200    # 结果里带的摘要长度（切词用全文）
+# 存进索引、搜索结果里返回的条目字段
+DOC_FIELDS = ('id', 'title', 'link', 'summary', 'source', 'category', 'time', 'image')
+
+_TOKEN = re.compile(r'[\u4e00-\u9fff]+|[a-z0-9]+')
+
+
+def _is_cjk(token):
+    return token[0] >= '\u4e00'
+
+
+def index_terms(text):
+    """条目文本的词：中文每个字和相邻两字，英文/数字按单词"""
+    terms = []
+    for token in _TOKEN.findall((text or '').lower()):
+        if _is_cjk(token):
+            terms.extend(token)
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.append(token)
+    return terms
+
+
+def query_terms(text):
+    """查询的词：中文只有一个字时用单字，否则用二元组（比单字准得多）；英文/数字按单词"""
+    terms = []
+    for token in _TOKEN.findall((text or '').lower()):
+        if _is_cjk(token) and len(token) > 1:
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.append(token)
+    return list(dict.fromkeys(terms))
+
+
+def _doc_key(category, doc_id):
+    return f"{category}:{doc_id}"
+
+
+def _weights(doc):
+    weights = {}
+    for term in index_terms(doc.get('title')):
+        weights[term] = weights.get(term, 0) + TITLE_WEIGHT
+    for term in index_terms(doc.get('full_summary', doc.get('summary'))):
+        weights[term] = weights.get(term, 0) + 1
+    return weights
+
+
+class SearchIndex:
+    """
+    倒排索引：词 -> {文档号: 权重}。文档号是递增整数，不复用；
+    文件里每个词的倒排表存成 [文档号, 权重, 文档号, 权重, ...] 的扁平列表
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = Path(path)
+        self.docs = {}       # 文档号 -> 条目字段 + first_seen/last_seen（摘要太长时另存 full_summary）
+        self.by_key = {}     # "分类:条目 ID" -> 文档号（同一条出现在两个分类里时各算一个文档）
+        self.postings = {}   # 词 -> {文档号: 权重}
+        self.next_no = 1
+        self.file_key = None  # 加载/写回时文件的 (mtime, 大小)，用来发现别的进程改写过
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        index = cls(path)
+        try:
+            with open(index.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return index
+        index.file_key = _file_key(index.path)
+        index.next_no = stored.get('next', 1)
+        index.docs = {int(no): doc for no, doc in stored.get('docs', {}).items()}
+        index.by_key = {_doc_key(doc['category'], doc['id']): no for no, doc in index.docs.items()}
+        for term, flat in stored.get('postings', {}).items():
+            index.postings[term] = dict(zip(flat[::2], flat[1::2]))
+        return index
+
+    def save(self):
+        with self._lock:
+            stored = {
+                "next": self.next_no,
+                "docs": self.docs,
+                "postings": {term: [value for pair in docs.items() for value in pair]
+                             for term, docs in self.postings.items()},
+            }
+            atomic_write(self.path, serialize(stored))
+            self.file_key = _file_key(self.path)
+
+    def _add(self, doc):
+        no = self.next_no
+        self.next_no += 1
+        self.docs[no] = doc
+        self.by_key[_doc_key(doc['category'], doc['id'])] = no
+        for term, weight in _weights(doc).items():
+            self.postings.setdefault(term, {})[no] = weight
+
+    def _remove(self, no):
+        doc = self.docs.pop(no)
+        del self.by_key[_doc_key(doc['category'], doc['id'])]
+        for term in _weights(doc):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(no, None)
+                if not docs:
+                    del self.postings[term]
+
+    def update(self, data, now=None):
+        """
+        用一份快照更新索引（原地），返回 (新增数, 删除数)：
+        新条目切词加入；标题/摘要变了的重新切词；其余只刷新时间、配图和最后出现时间
+        """
+        now = now or time.time()
+        added = removed = 0
+        with self._lock:
+            for category, items in data.items():
+                if not isinstance(items, list):
+                    continue
+                for item in items:
+                    doc_id = item.get('id') or item_id(item.get('link', ''), item.get('title', ''))
+                    summary = item.get('summary') or ''
+                    doc = {field: item.get(field) for field in DOC_FIELDS if item.get(field)}
+                    doc.update(id=doc_id, category=category, summary=summary[:SUMMARY_CHARS], last_seen=now)
+                    if len(summary) > SUMMARY_CHARS:
+                        doc['full_summary'] = summary
+
+                    no = self.by_key.get(_doc_key(category, doc_id))
+                    if no is not None:
+                        old = self.docs[no]
+                        if old.get('title') == doc.get('title') and \
+                                old.get('full_summary', old.get('summary')) == summary:
+                            doc['first_seen'] = old['first_seen']
+                            self.docs[no] = doc
+                            continue
+                        doc['first_seen'] = old['first_seen']
+                        self._remove(no)
+                        removed += 1
+                    else:
+                        doc['first_seen'] = now
+                    self._add(doc)
+                    added += 1
+
+            cutoff = now - RETENTION_DAYS * 86400
+            stale = [no for no, doc in self.docs.items() if doc['last_seen'] < cutoff]
+            excess = len(self.docs) - len(stale) - MAX_DOCS
+            if excess > 0:
+                fresh = sorted((no for no, doc in self.docs.items() if doc['last_seen'] >= cutoff),
+                               key=lambda no: self.docs[no]['last_seen'])
+                stale.extend(fresh[:excess])
+            for no in stale:
+                self._remove(no)
+            removed += len(stale)
+        return added, removed
+
+    def search(self, query, category=None, limit=20):
+        """
+        所有查询词都出现的条目，按 Σ 权重 × idf 排序（同分时新的在前），返回 (结果列表, 命中总数)
+        每条结果是条目字段加 score
+        """
+        terms = query_terms(query)
+        if not terms:
+            return [], 0
+        with self._lock:
+            lists = []
+            for term in terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    return [], 0
+                lists.append((term, docs))
+            lists.sort(key=lambda entry: len(entry[1]))
+            candidates = set(lists[0][1])
+            for _, docs in lists[1:]:
+                candidates.intersection_update(docs)
+                if not candidates:
+                    return [], 0
+            if category:
+                candidates = {no for no in candidates if self.docs[no].get('category') == category}
+
+            total_docs = len(self.docs)
+            idf = {term: math.log(1 + total_docs / len(docs)) for term, docs in lists}
+            scored = []
+            for no in candidates:
+                score = sum(docs[no] * idf[term] for term, docs in lists)
+                scored.append((score, self.docs[no]['first_seen'], no))
+            scored.sort(reverse=True)
+            results = []
+            for score, _, no in scored[:limit]:
+                doc = self.docs[no]
+                result = {field: doc[field] for field in DOC_FIELDS if field in doc}
+                result['score'] = round(score, 2)
+                results.append(result)
+            return results, len(scored)
+
+    def __len__(self):
+        return len(self.docs)
+
+
+_indexes = {}  # 路径 -> 已加载的索引，常驻进程里不用每轮重新读文件
+_indexes_lock = threading.Lock()
+
+
+def _file_key(path):
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_index(path=INDEX_FILE):
+    """进程内共享的索引；文件被别的进程改写过（mtime/大小和上次加载、写回时不同）就重新加载"""
+    path = Path(path)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None or _file_key(path) != index.file_key:
+            index = _indexes[path] = SearchIndex.load(path)
+        return index
+
+
+def update(data, path=INDEX_FILE):
+    """发布时调用：增量更新索引并写回文件，返回 (新增数, 删除数)"""
+    index = get_index(path)
+    counts = index.update(data)
+    index.save()
+    return counts
+
+
+if __name__ == "__main__":
+    with open(Path(__file__).parent.parent / "data" / "news.json", 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    index = SearchIndex(Path("/dev/null"))
+    started = time.perf_counter()
+    index.update(snapshot)
+    print(f"建索引: {len(index)} 条，{len(index.postings)} 个词，{(time.perf_counter() - started) * 1000:.1f}ms")
+    for sample in ('嘉定', '元宝', 'ai', '新城建设'):
+        started = time.perf_counter()
+        results, total = index.search(sample, limit=3)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{sample}: {total} 条，{elapsed:.3f}ms  {[result['title'][:16] for result in results]}")
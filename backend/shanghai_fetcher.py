@@ -3,34 +3,14 @@
 上海新闻抓取 - 直接抓取官网（绕过RSSHub）
 """
 
-import requests
 import re
 import json
 from datetime import datetime
 from html import unescape
 
-PROXY = {'http': 'http://127.0.0.1:1082', 'https': 'http://127.0.0.1:1082'}
-headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'}
-
-def is_shanghai_relevant(title, summary=""):
-    """判断是否与嘉定/节气/社区相关"""
-    text = (title + summary).lower()
-    
-    jiading_keywords = ['嘉定', '南翔', '江桥', '安亭', '马陆', '外冈', '徐行', '华亭', '菊园', '新成路', '真新', '嘉定新城', '州桥', '法华塔']
-    season_keywords = ['立春', '雨水', '惊蛰', '春分', '清明', '谷雨', '立夏', '小满', '芒种', '夏至', '小暑', '大暑',
-                       '立秋', '处暑', '白露', '秋分', '寒露', '霜降', '立冬', '小雪', '大雪', '冬至', '小寒', '大寒']
-    community_keywords = ['社区', '街道', '居委会', '业委会', '物业', '邻里', '便民', '养老', '托育', '菜场', '旧改', '加装电梯']
-    
-    has_jiading = any(kw in text for kw in jiading_keywords)
-    has_season = any(kw in text for kw in season_keywords)
-    has_community = any(kw in text for kw in community_keywords)
-    
-    return {
-        'jiading': has_jiading,
-        'season': has_season,
-        'community': has_community,
-        'score': int(has_jiading) * 3 + int(has_season) * 2 + int(has_community) * 1
-    }
+import http_client
+from dedup import dedup_items
+from keyword_matcher import is_shanghai_relevant
 
 def fetch_thepaper():
     """抓取澎湃新闻官网"""
@@ -38,7 +18,7 @@ def fetch_thepaper():
     try:
         # 直接抓首页热门新闻
         url = "https://www.thepaper.cn/"
-        response = requests.get(url, headers=headers, timeout=15, proxies=PROXY)
+        response = http_client.get(url, timeout=15)
         
         if response.status_code == 200:
             html = response.text
@@ -85,7 +65,7 @@ def fetch_eastday():
     items = []
     try:
         url = "https://www.eastday.com/"
-        response = requests.get(url, headers=headers, timeout=15, proxies=PROXY)
+        response = http_client.get(url, timeout=15)
         
         if response.status_code == 200:
             html = response.text
@@ -121,7 +101,7 @@ def fetch_sina_shanghai():
     items = []
     try:
         url = "https://feed.mix.sina.com.cn/api/roll/get?pageid=153&lid=2515&k=&num=20&r=0.123"
-        response = requests.get(url, headers=headers, timeout=15, proxies=PROXY)
+        response = http_client.get(url, timeout=15)
         
         if response.status_code == 200:
             data = response.json()
@@ -195,12 +175,7 @@ def fetch_shanghai_news():
     print(f"  ✓ 嘉定精选: {len(jiading_manual)} 条")
     
     # 去重
-    seen = set()
-    unique_items = []
-    for item in items:
-        if item['title'] not in seen:
-            seen.add(item['title'])
-            unique_items.append(item)
+    unique_items = dedup_items(items)
     
     # 按相关度排序
     unique_items.sort(key=lambda x: x.get('score', 0), reverse=True)
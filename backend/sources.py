@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+新闻源注册表
+每个源一行配置（地址、类型、解析器、条数、分类、是否翻译、相关度打分），
+由同一个执行器统一抓取、解析、打分、翻译，便于并发、单独调度和统计
+"""
+
+import html
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import http_client
+import feed_cache
+import hn_client
+from image_handler import extract_image_from_entry
+import item_store
+from dedup import dedup_items
+from fetch_engine import run_jobs
+from keyword_matcher import is_shanghai_relevant
+from translator import translate_titles
+from url_canon import item_id
+
+# 持仓股票列表
+PORTFOLIO = ['TSLA', 'RKLB', 'QS', 'PLTR', 'RXRX', 'COIN', 'MSTR']
+
+# 输出时分类的顺序
+CATEGORIES = ["shanghai", "stocks", "policy", "world", "ai"]
+
+# 默认轮询间隔（秒）
+DEFAULT_INTERVAL = 300
+
+# Reddit/HN 的票数、评论数：单独存字段（每轮都在变，publisher 算内容哈希时忽略），不拼进摘要
+VOTE_KEYS = ('votes', 'comments')
+
+
+# ---------- 通用工具 ----------
+
+def format_time(published):
+    """格式化时间"""
+    if not published:
+        return ""
+
+    formats = [
+        "%a, %d %b %Y %H:%M:%S %z",
+        "%a, %d %b %Y %H:%M:%S GMT",
+        "%Y-%m-%dT%H:%M:%S",
+        "%Y-%m-%dT%H:%M:%S%z",
+        "%Y-%m-%d %H:%M:%S",
+    ]
+
+    for fmt in formats:
+        try:
+            clean_pub = published.strip().replace('+0800', '+08:00')
+            dt = datetime.strptime(clean_pub[:26], fmt)
+            return dt.strftime("%m-%d %H:%M")
+        except:
+            continue
+
+    return published[:16] if len(published) > 16 else published
+
+def is_recent(published_parsed):
+    """判断是否是24小时内的新闻"""
+    if not published_parsed:
+        return False
+    try:
+        pub_timestamp = time.mktime(published_parsed)
+        pub_time = datetime.fromtimestamp(pub_timestamp)
+        return datetime.now() - pub_time < timedelta(hours=24)
+    except:
+        return False
+
+def strip_tags(text, limit=300):
+    """RSS 摘要去掉 HTML 标签，只留前 limit 个字用来打分"""
+    return html.unescape(re.sub(r'<[^>]+>', '', text or '')).strip()[:limit]
+
+def today():
+    return datetime.now().strftime("%m-%d")
+
+
+# ---------- 解析器：把原始响应变成记录 {title, link, time, isNew, [summary], [description], [votes], [comments]} ----------
+# description 是正文摘要，只用于相关度打分，不输出
+
+def parse_rss(src, entries):
+    """RSS 条目"""
+    records = []
+    for entry in entries[:src['limit']]:
+        records.append({
+            "title": html.unescape(entry.get("title", "")).strip(),
+            "link": entry.get("link", ""),
+            "time": format_time(entry.get("published", "")),
+            "isNew": is_recent(entry.get("published_parsed")),
+            "description": strip_tags(entry.get("summary", "")),
+            "image": extract_image_from_entry(entry),
+        })
+    return records
+
+def parse_rss_daily(src, entries):
+    """按天更新的榜单类 RSS（GitHub Trending），时间统一记为今日"""
+    records = parse_rss(src, entries)
+    for record in records:
+        record["time"] = "今日"
+        record["isNew"] = True
+    return records
+
+def parse_sina_roll(src, data):
+    """新浪滚动新闻接口"""
+    records = []
+    if data.get('result') and data['result'].get('data'):
+        for item in data['result']['data'][:src['limit']]:
+            time_str = str(item.get('time', ''))
+            records.append({
+                "title": item.get('title', '').strip(),
+                "link": item.get('url', ''),
+                "time": time_str[5:16] if len(time_str) > 16 else time_str,
+                "isNew": True,
+                "description": item.get('intro', ''),
+            })
+    return records
+
+def parse_reddit(src, data):
+    """Reddit listing JSON"""
+    records = []
+    for post in data['data']['children'][:src['limit']]:
+        post_data = post['data']
+        records.append({
+            "title": html.unescape(post_data['title']),
+            "link": "https://reddit.com" + post_data['permalink'],
+            "votes": post_data.get('score', 0),
+            "comments": post_data.get('num_comments', 0),
+            "time": datetime.fromtimestamp(post_data['created']).strftime("%m-%d %H:%M"),
+            "isNew": True,
+        })
+    return records
+
+def parse_finnhub(src, news_list):
+    """Finnhub 新闻接口（标题前标出相关持仓）"""
+    records = []
+    for news in news_list[:src['limit']]:
+        related_symbols = [s for s in PORTFOLIO if s in str(news.get('related', ''))]
+        symbol_tag = f"[{','.join(related_symbols)}] " if related_symbols else ""
+        records.append({
+            "title": f"{symbol_tag}{news.get('headline', '')}",
+            "link": news.get('url', ''),
+            "summary": news.get('source', 'Finnhub'),
+            "time": datetime.fromtimestamp(news.get('datetime', 0)).strftime("%m-%d %H:%M") if news.get('datetime') else today(),
+            "isNew": True,
+        })
+    return records
+
+def parse_kankanews(src, page):
+    """看看新闻首页，匹配 /a/YYYY-MM-DD/xxxxx.shtml 链接"""
+    news_pattern = r'href="(/a/\d{4}-\d{2}-\d{2}/\d+\.shtml)"[^>]*>([^<]+)</a>'
+    records = []
+    seen = set()
+    for link, title in re.findall(news_pattern, page)[:src['limit']]:
+        if link not in seen and title.strip():
+            seen.add(link)
+            records.append({
+                "title": html.unescape(title.strip()),
+                "link": f"https://www.kankanews.com{link}" if link.startswith('/') else link,
+                "time": today(),
+                "isNew": True,
+            })
+    return records
+
+def parse_jiading_manual(src, _):
+    """嘉定精选（手动维护）"""
+    return [
+        {"title": "🏠 嘉定新城建设提速，多个重大项目集中开工", "link": "https://www.jiading.gov.cn/",
+         "summary": "嘉定区推动新城建设，聚焦科技创新", "source": "嘉定发布", "time": today(), "isNew": True, "score": 3},
+        {"title": "👥 南翔镇加装电梯工程又有新进展，多个小区完成签约", "link": "https://www.jiading.gov.cn/",
+         "summary": "南翔镇推进老旧小区加装电梯", "source": "南翔镇", "time": today(), "isNew": True, "score": 3},
+        {"title": "🌸 州桥老街春节民俗活动安排出炉", "link": "https://www.jiading.gov.cn/",
+         "summary": "州桥老街春节期间民俗文化活动", "source": "嘉定文旅", "time": "02-01", "isNew": False, "score": 2},
+        {"title": "👥 江桥镇推进'15分钟社区生活圈'建设", "link": "https://www.jiading.gov.cn/",
+         "summary": "江桥镇便民服务设施升级", "source": "江桥镇", "time": today(), "isNew": True, "score": 2},
+    ]
+
+def parse_stock_backup(src, _):
+    """美股备用静态链接（实时源都失败时使用）"""
+    return [
+        {"title": "🚀 RKLB Rocket Lab 最新发射任务", "link": "https://www.rocketlabusa.com/news/",
+         "summary": "官方新闻与发射更新", "source": "Rocket Lab", "time": today(), "isNew": True},
+        {"title": "⚡ TSLA 特斯拉投资者关系", "link": "https://ir.tesla.com/",
+         "summary": "财报、新闻与公告", "source": "Tesla IR", "time": today(), "isNew": True},
+        {"title": "📊 PLTR Palantir 商业动态", "link": "https://investors.palantir.com/news/",
+         "summary": "政府与企业合同", "source": "Palantir", "time": today(), "isNew": True},
+    ]
+
+def fetch_hacker_news(src):
+    """Hacker News：榜单 + 并发取详情（详情按故事 ID 缓存，见 hn_client）"""
+    records = []
+    for story in hn_client.top_stories(src['limit']):
+        records.append({
+            "title": story['title'],
+            "link": story.get('url') or f"https://news.ycombinator.com/item?id={story['id']}",
+            "votes": story.get('score') or 0,
+            "time": datetime.fromtimestamp(story['time']).strftime("%m-%d %H:%M") if story.get('time') else today(),
+            "isNew": is_recent(time.localtime(story['time'])) if story.get('time') else True,
+        })
+    return records
+
+
+# ---------- 相关度打分 (src, item, description)：原地修改 item ----------
+
+def score_shanghai(src, item, description=""):
+    """嘉定/节气/社区相关度（标题 + 正文摘要），写入 score 并在摘要里标出；tags=True 的源还在标题前加标记"""
+    relevance = is_shanghai_relevant(item['title'], description)
+    item['score'] = relevance['score']
+    if relevance['score'] > 0:
+        item['summary'] = f"{item['summary']} · 相关度:{relevance['score']}"
+    if src.get('tags'):
+        tags = []
+        if relevance['jiading']: tags.append('🏠')
+        if relevance['season']: tags.append('🌸')
+        if relevance['community']: tags.append('👥')
+        if tags:
+            item['title'] = f"{' '.join(tags)} {item['title']}"
+
+def score_portfolio(src, item, description=""):
+    """标题提到持仓股票时加 📈"""
+    if any(s.lower() in item['title'].lower() for s in PORTFOLIO):
+        item['title'] = f"📈 {item['title']}"
+
+
+# ---------- 源配置表 ----------
+# name: 唯一名称（日志/统计用）  source: 展示的来源名（默认同 name）  summary: 默认摘要（默认同 source）
+# kind: rss / json / html / static / custom   url 或 urls（按顺序尝试，第一个成功的为准）
+# parser: 解析函数  limit: 最多条数  timeout: 超时秒数  translate: 是否翻译标题
+# prefix: 标题前缀  scorer: 相关度打分函数  truncate: 标题截断长度
+# interval: 常驻调度（scheduler.py）时的初始轮询间隔秒数，默认 300，之后按更新频率自动调整
+
+SOURCES = [
+    # 上海新闻
+    {"name": "新浪上海", "category": "shanghai", "kind": "json", "parser": parse_sina_roll, "limit": 30, "timeout": 15,
+     "url": "https://feed.mix.sina.com.cn/api/roll/get?pageid=153&lid=2515&k=&num=30&r=0.123",
+     "scorer": score_shanghai, "tags": True},
+    {"name": "嘉定精选", "category": "shanghai", "kind": "static", "parser": parse_jiading_manual, "interval": 3600},
+    {"name": "上观新闻", "category": "shanghai", "kind": "rss", "url": "https://rsshub.app/jfdaily/reconstruction",
+     "limit": 10, "timeout": 15, "scorer": score_shanghai},
+    {"name": "文汇报", "category": "shanghai", "kind": "rss", "url": "https://rsshub.app/whb/bihui",
+     "limit": 8, "timeout": 15, "scorer": score_shanghai},
+    {"name": "新民晚报", "category": "shanghai", "kind": "rss", "url": "https://rsshub.app/xinmin/daily",
+     "limit": 8, "timeout": 15, "scorer": score_shanghai},
+    {"name": "东方网", "category": "shanghai", "kind": "rss",
+     "urls": ["https://rsshub.app/eastday/sh", "https://rsshub.app/eastday/china"],
+     "limit": 8, "timeout": 10, "scorer": score_shanghai},
+    {"name": "看看新闻", "category": "shanghai", "kind": "html", "parser": parse_kankanews, "url": "https://www.kankanews.com/",
+     "limit": 10, "timeout": 15, "scorer": score_shanghai},
+    {"name": "新闻晨报", "category": "shanghai", "kind": "rss", "url": "https://rsshub.app/shxwcb",
+     "limit": 8, "timeout": 15, "scorer": score_shanghai},
+    {"name": "青年报", "category": "shanghai", "kind": "rss", "url": "https://rsshub.app/qnb",
+     "limit": 8, "timeout": 15, "scorer": score_shanghai},
+    {"name": "劳动报", "category": "shanghai", "kind": "rss", "url": "https://rsshub.app/ldrb",
+     "limit": 8, "timeout": 15, "scorer": score_shanghai},
+
+    # 美股
+    {"name": "Finnhub", "source": "美股快讯", "category": "stocks", "kind": "json", "parser": parse_finnhub,
+     "url": "https://finnhub.io/api/v1/news?category=general", "limit": 10, "timeout": 10, "interval": 180},
+    {"name": "Yahoo Finance", "source": "Yahoo财经", "summary": "Yahoo Finance", "category": "stocks", "kind": "rss",
+     "url": "https://rsshub.app/yahoo/news/markets", "limit": 8, "timeout": 10, "translate": True},
+    {"name": "Seeking Alpha", "category": "stocks", "kind": "rss", "url": "https://rsshub.app/seekingalpha/feed/top-news",
+     "limit": 6, "timeout": 10, "scorer": score_portfolio},
+
+    # 国内政策
+    {"name": "国务院", "summary": "国务院政策", "category": "policy", "kind": "rss", "url": "https://rsshub.app/gov/zhengce/zuixin",
+     "limit": 8, "timeout": 15, "prefix": "🇨🇳 ", "interval": 1800},
+    {"name": "发改委", "summary": "国家发改委", "category": "policy", "kind": "rss", "url": "https://rsshub.app/gov/ndrc/zwxxgk",
+     "limit": 5, "timeout": 10, "prefix": "📈 ", "interval": 1800},
+    {"name": "工信部", "summary": "工信部政策", "category": "policy", "kind": "rss", "url": "https://rsshub.app/gov/miit/zcwj",
+     "limit": 5, "timeout": 10, "prefix": "🔧 ", "interval": 1800},
+    {"name": "央行", "summary": "央行政策研究", "category": "policy", "kind": "rss", "url": "https://rsshub.app/gov/pbc/zcyj",
+     "limit": 5, "timeout": 10, "prefix": "💰 ", "interval": 1800},
+    {"name": "上海市政府", "category": "policy", "kind": "rss", "url": "https://rsshub.app/gov/shanghai/zhengce",
+     "limit": 5, "timeout": 10, "prefix": "🏙️ ", "interval": 1800},
+    {"name": "商务部", "category": "policy", "kind": "rss", "url": "https://rsshub.app/gov/mofcom/swgat",
+     "limit": 5, "timeout": 10, "prefix": "🌐 ", "interval": 1800},
+
+    # 世界新闻
+    {"name": "Reddit", "source": "Reddit 国际新闻", "category": "world", "kind": "json", "parser": parse_reddit,
+     "url": "https://www.reddit.com/r/worldnews/new.json?limit=10", "limit": 10, "timeout": 10, "translate": True,
+     "headers": {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}, "interval": 120},
+    {"name": "BBC", "summary": "BBC World", "category": "world", "kind": "rss", "url": "http://feeds.bbci.co.uk/news/world/rss.xml",
+     "limit": 8, "timeout": 15, "translate": True},
+
+    # AI / 科技
+    {"name": "Hacker News", "category": "ai", "kind": "custom", "fetch": fetch_hacker_news, "limit": 20, "translate": True},
+    {"name": "TechCrunch", "category": "ai", "kind": "rss", "url": "https://rsshub.app/techcrunch",
+     "limit": 6, "timeout": 15, "translate": True, "prefix": "🚀 "},
+    {"name": "OpenAI", "summary": "OpenAI 官方", "category": "ai", "kind": "rss", "url": "https://rsshub.app/openai/blog",
+     "limit": 5, "timeout": 10, "prefix": "🔥 ", "interval": 1800},
+    {"name": "Google AI", "summary": "Google Research", "category": "ai", "kind": "rss", "url": "https://rsshub.app/google/research",
+     "limit": 5, "timeout": 10, "prefix": "🔬 ", "interval": 1800},
+    {"name": "arXiv", "summary": "arXiv AI", "category": "ai", "kind": "rss", "url": "https://rsshub.app/papers/arxiv/CS.AI",
+     "limit": 5, "timeout": 10, "prefix": "📄 ", "truncate": 60, "interval": 3600},
+    {"name": "GitHub", "summary": "GitHub 今日热门", "category": "ai", "kind": "rss", "parser": parse_rss_daily,
+     "url": "https://rsshub.app/github/trending/daily/python", "limit": 5, "timeout": 10, "prefix": "⭐ ", "interval": 3600},
+]
+
+# 每个分类合并后的处理：去重（近似标题合并，见 dedup.py）、数量上限、按相关度排序、数据不足时补充的备用源
+CATEGORY_RULES = {
+    "shanghai": {"dedup": True, "sort_by_score": True},
+    "stocks": {"dedup": True, "limit": 15, "backup": {"name": "美股备用", "kind": "static", "parser": parse_stock_backup}, "min_items": 5},
+    "policy": {"dedup": True, "limit": 20},
+    "world": {"dedup": True},
+    "ai": {"dedup": True, "limit": 40},  # HN 20 条 + 其他源约 20 条
+}
+
+SOURCES_BY_NAME = {src["name"]: src for src in SOURCES}
+
+
+# ---------- 执行器 ----------
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _log(message):
+    """多线程同时打印时一次写完整行，避免输出串行"""
+    sys.stdout.write(message + "\n")
+    sys.stdout.flush()
+
+
+def _defaults(src):
+    src = dict(src)
+    src.setdefault("source", src["name"])
+    src.setdefault("summary", src["source"])
+    src.setdefault("limit", 10)
+    src.setdefault("timeout", 15)
+    src.setdefault("parser", parse_rss)
+    src.setdefault("interval", DEFAULT_INTERVAL)
+    return src
+
+def fetch_payload(src):
+    """按类型发请求，返回解析前的数据；所有候选地址都失败时返回 None"""
+    kind = src["kind"]
+    if kind == "static":
+        return True
+    for url in src.get("urls") or [src["url"]]:
+        try:
+            if kind == "rss":
+                payload = feed_cache.fetch_entries(url, headers=src.get("headers"), timeout=src["timeout"])
+            else:
+                response = http_client.get(url, headers=src.get("headers"), timeout=src["timeout"])
+                if response.status_code != 200:
+                    continue
+                payload = response.json() if kind == "json" else response.text
+        except Exception:
+            if len(src.get("urls") or []) > 1:
+                continue
+            raise
+        if payload is not None:
+            return payload
+    return None
+
+def _enrich(src, record):
+    """单条记录 -> 输出条目：补全来源/摘要，打分（翻译和前缀在外面批量做）"""
+    title = record["title"]
+    if src.get("truncate"):
+        title = f"{title[:src['truncate']]}..."
+    item = {
+        "id": record["id"],
+        "title": title,
+        "link": record.get("link", ""),
+        "summary": record.get("summary") or src["summary"],
+        "source": record.get("source") or src["source"],
+        "time": record.get("time", ""),
+        "isNew": record.get("isNew", True),
+    }
+    if "score" in record:
+        item["score"] = record["score"]
+    for key in VOTE_KEYS:
+        if key in record:
+            item[key] = record[key]
+    if record.get("image"):
+        item["image"] = record["image"]  # RSS 自带配图，imageType 在 add_images 里补
+    if src.get("scorer"):
+        src["scorer"](src, item, record.get("description", ""))
+    return item
+
+def build_items(src, records):
+    """
+    记录 -> 输出条目
+    条目库里已有且标题/链接没变的直接复用（连同翻译、打分、配图），只处理新条目
+    """
+    store = item_store.get_store()
+    keys = []
+    for record in records:
+        record["id"] = item_id(record.get("link", ""), record["title"])
+        keys.append(item_store.key(record.get("source") or src["source"], record["id"]))
+    known = store.get_many(keys)
+
+    items = []
+    fresh = []
+    fingerprints = {}
+    for record, key in zip(records, keys):
+        stored = known.get(key)
+        fingerprint = item_store.fingerprint(record)
+        if stored and stored["fingerprint"] == fingerprint and stored["item"].get("translated") is not False:
+            item = stored["item"]
+            # 易变字段用这次抓到的：时间（不少源用抓取当天的 today()）、是否最新、Reddit/HN 的票数和评论数
+            item["time"] = record.get("time", "")
+            item["isNew"] = record.get("isNew", True)
+            for key in VOTE_KEYS:
+                if key in record:
+                    item[key] = record[key]
+        else:
+            item = _enrich(src, record)
+            fresh.append(item)
+            fingerprints[key] = fingerprint
+        items.append(item)
+
+    prefix = src.get("prefix", "")
+    if src.get("translate"):
+        translate_titles(fresh, prefix=prefix)
+    elif prefix:
+        for item in fresh:
+            item["title"] = f"{prefix}{item['title']}"
+    store.save(fresh, category=src["category"], fingerprints=fingerprints)
+    return items
+
+def run_source(src):
+    """抓取单个源，返回条目列表；失败返回空列表"""
+    src = _defaults(src)
+    t0 = time.time()
+    ok = False
+    items = []
+    try:
+        if src["kind"] == "custom":
+            records = src["fetch"](src)
+        else:
+            payload = fetch_payload(src)
+            records = src["parser"](src, payload) if payload is not None else None
+        if records is not None:
+            items = build_items(src, records)
+            ok = True
+            _log(f"  ✓ {src['name']}: {len(items)} 条")
+        else:
+            _log(f"  ✗ {src['name']}: 请求失败")
+    except Exception as e:
+        _log(f"  ✗ {src['name']}: {str(e)[:50]}")
+    finally:
+        with _stats_lock:
+            _stats[src["name"]] = {"ok": ok, "items": len(items), "elapsed": time.time() - t0}
+    return items
+
+def run_sources(sources=None, serial=False):
+    """并发抓取一组源（默认全部），返回 {name: items}，顺序与配置表一致"""
+    sources = SOURCES if sources is None else sources
+    results = run_jobs([(src["name"], run_source, (src,)) for src in sources], serial=serial)
+    return {name: items or [] for name, items in results.items()}
+
+def build_category(category, results):
+    """把各源结果按配置表顺序合并成一个分类，并应用该分类的规则"""
+    rules = CATEGORY_RULES.get(category, {})
+    items = []
+    for src in SOURCES:
+        if src["category"] == category:
+            items.extend(results.get(src["name"], []))
+
+    if rules.get("backup") and len(items) < rules.get("min_items", 0):
+        # 备用源不在 SOURCES 里，没有 category，条目库存条目时要用
+        backup_items = run_source(dict(rules["backup"], category=category))
+        items.extend(backup_items)
+        print(f"    ⚠️ {category} 使用备用数据: {len(backup_items)} 条")
+
+    if rules.get("dedup"):
+        items = dedup_items(items)
+
+    if rules.get("sort_by_score"):
+        items.sort(key=lambda x: x.get('score', 0), reverse=True)
+
+    if rules.get("limit"):
+        items = items[:rules["limit"]]
+    return items
+
+def fetch_category(category, serial=False):
+    """只抓取某个分类的所有源"""
+    sources = [src for src in SOURCES if src["category"] == category]
+    return build_category(category, run_sources(sources, serial=serial))
+
+def stats():
+    """每个源最近一次运行的结果 {name: {ok, items, elapsed}}"""
+    with _stats_lock:
+        return {name: dict(stat) for name, stat in _stats.items()}
+
+def print_stats():
+    result = stats()
+    if not result:
+        return
+    print("\n📊 各源统计 (条数 / 耗时)")
+    for name, stat in sorted(result.items(), key=lambda kv: -kv[1]["elapsed"]):
+        mark = "✓" if stat["ok"] else "✗"
+        print(f"   {mark} {name}: {stat['items']} / {stat['elapsed']:.1f}s")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+标题翻译
+Google Translate 免费接口 + 本地持久化缓存（LRU + 过期时间），同一进程内所有调用共用一份缓存
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from pathlib import Path
+
+import http_client
+
+CACHE_FILE = Path(__file__).parent.parent / "data" / "cache" / "translations.json"
+CACHE_MAX_ENTRIES = 5000
+CACHE_TTL = 7 * 24 * 3600  # 7天
+# 批量翻译时每个请求最多塞多少字符（URL 编码后），避免 URL 过长被拒
+BATCH_MAX_CHARS = 1800
+# 批量翻译的分隔符：换行会被翻译接口原样保留，标题里的换行已在 normalize 时去掉
+BATCH_DELIMITER = '\n'
+
+
+class TranslationCache:
+    """(规范化文本, 目标语言) -> 译文，超出容量时淘汰最久未用的条目"""
+
+    def __init__(self, path, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def make_key(text, target_lang):
+        return f"{target_lang}\x1f{normalize(text)}"
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        # 文件里按最近使用的顺序保存，读回来顺序不变
+        for key, (translation, stamp) in raw.items():
+            if now - stamp < self.ttl:
+                self._entries[key] = (translation, stamp)
+
+    def get(self, text, target_lang):
+        key = self.make_key(text, target_lang)
+        with self._lock:
+            record = self._entries.get(key)
+            if record is None or time.time() - record[1] >= self.ttl:
+                if record is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return record[0]
+
+    def put(self, text, target_lang, translation):
+        key = self.make_key(text, target_lang)
+        with self._lock:
+            self._entries[key] = (translation, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def save(self):
+        with self._lock:
+            data = dict(self._entries)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.path.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, self.path)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """进程内共享的翻译缓存，第一次使用时从磁盘加载"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranslationCache(CACHE_FILE)
+        return _cache
+
+
+def normalize(text):
+    """去掉首尾空白、合并连续空白"""
+    return ' '.join(text.split())
+
+
+def has_chinese(text):
+    return any('\u4e00' <= char <= '\u9fff' for char in text)
+
+
+def _request_translation(text, target_lang):
+    """实际调用翻译接口，失败返回 None"""
+    url = f"https://translate.googleapis.com/translate_a/single?client=gtx&sl=auto&tl={target_lang}&dt=t&q={urllib.parse.quote(text)}"
+    response = http_client.get(url, timeout=10)
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    # 解析返回结果
+    translated_parts = []
+    for item in data[0]:
+        if item[0]:
+            translated_parts.append(item[0])
+    return ''.join(translated_parts)
+
+
+def translate_text(text, target_lang='zh-CN'):
+    """使用 Google Translate 免费 API 翻译（带缓存）"""
+    try:
+        if not text or len(text.strip()) == 0:
+            return text
+
+        # 检测是否包含中文
+        if has_chinese(text):
+            return text  # 已经有中文，不翻译
+
+        # 限制长度，避免API限制
+        text_to_translate = normalize(text)[:500]
+
+        cached = get_cache().get(text_to_translate, target_lang)
+        if cached is not None:
+            return cached
+
+        translated = _translate_uncached(text_to_translate, target_lang)
+        return translated if translated is not None else text  # 翻译失败返回原文
+    except Exception as e:
+        return text  # 出错返回原文
+
+
+def _translate_uncached(text, target_lang):
+    """翻译单条（不查缓存），成功后写入缓存；失败返回 None，不缓存，下次再试"""
+    try:
+        translated = _request_translation(text, target_lang)
+    except Exception:
+        return None
+    if translated is not None:
+        get_cache().put(text, target_lang, translated)
+    return translated
+
+
+def _pack_batches(texts):
+    """把待翻译文本按长度装箱，每箱一个请求"""
+    batches = []
+    current = []
+    current_size = 0
+    for text in texts:
+        size = len(urllib.parse.quote(text)) + 3  # +3: 编码后的分隔符
+        if current and current_size + size > BATCH_MAX_CHARS:
+            batches.append(current)
+            current = []
+            current_size = 0
+        current.append(text)
+        current_size += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _translate_one_batch(texts, target_lang):
+    """一个请求翻译多条，拆分结果对不上时返回 None"""
+    translated = _request_translation(BATCH_DELIMITER.join(texts), target_lang)
+    if translated is None:
+        return None
+    parts = [part.strip() for part in translated.strip().split(BATCH_DELIMITER)]
+    if len(parts) != len(texts) or not all(parts):
+        return None
+    return parts
+
+
+def translate_batch(texts, target_lang='zh-CN'):
+    """
+    批量翻译，返回与 texts 一一对应的译文列表
+    缓存命中的不发请求；其余尽量合并到少数几个请求里，某一箱拆分失败时退回逐条翻译
+    """
+    results = list(texts)
+    cache = get_cache()
+    pending = {}  # 规范化文本 -> 在 texts 里的下标列表
+
+    for i, text in enumerate(texts):
+        if not text or not text.strip() or has_chinese(text):
+            continue
+        normalized = normalize(text)[:500]
+        cached = cache.get(normalized, target_lang)
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.setdefault(normalized, []).append(i)
+
+    for batch in _pack_batches(list(pending)):
+        try:
+            translations = _translate_one_batch(batch, target_lang) if len(batch) > 1 else None
+        except Exception:
+            translations = None
+
+        if translations is None:
+            # 拆分对不上（或只有一条），逐条翻译
+            translations = [_translate_uncached(text, target_lang) for text in batch]
+        else:
+            for text, translation in zip(batch, translations):
+                cache.put(text, target_lang, translation)
+
+        for text, translation in zip(batch, translations):
+            if translation is None:
+                continue  # 翻译失败保留原文
+            for i in pending[text]:
+                results[i] = translation
+    return results
+
+
+# 延后翻译模式：缓存没命中的标题先用原文发布，由后台线程翻译后回填
+_deferred = False
+_pending = []  # [(item, 原文, prefix), ...]
+_pending_lock = threading.Lock()
+
+
+def set_deferred(enabled):
+    """开启/关闭延后翻译模式"""
+    global _deferred
+    _deferred = enabled
+
+
+def translate_titles(items, prefix=''):
+    """批量翻译一组新闻的标题（原地修改），译文前面加上 prefix"""
+    if not _deferred:
+        translations = translate_batch([item['title'] for item in items])
+        for item, translation in zip(items, translations):
+            item['title'] = f"{prefix}{translation}"
+        return items
+
+    # 延后模式：只用缓存，没命中的先挂原文并打上 translated: false
+    cache = get_cache()
+    for item in items:
+        raw = item['title']
+        if not raw or not raw.strip() or has_chinese(raw):
+            item['title'] = f"{prefix}{raw}"
+            continue
+        cached = cache.get(normalize(raw)[:500], 'zh-CN')
+        if cached is not None:
+            item['title'] = f"{prefix}{cached}"
+        else:
+            item['title'] = f"{prefix}{raw}"
+            item['translated'] = False
+            with _pending_lock:
+                _pending.append((item, raw, prefix))
+    return items
+
+
+def pending_count():
+    with _pending_lock:
+        return len(_pending)
+
+
+def start_deferred_translation(on_done=None):
+    """
+    后台翻译所有挂起的标题，翻译完原地改写对应的 item，再调用 on_done()（一般是重新发布快照）
+    返回后台线程；没有挂起的标题时返回 None
+    """
+    with _pending_lock:
+        jobs = list(_pending)
+        _pending.clear()
+    if not jobs:
+        return None
+
+    def worker():
+        translations = translate_batch([raw for _, raw, _ in jobs])
+        patched = 0
+        for (item, raw, prefix), translation in zip(jobs, translations):
+            if translation != raw:
+                item['title'] = f"{prefix}{translation}"
+                item['translated'] = True
+                patched += 1
+        print(f"\n🌐 后台翻译完成: {patched}/{len(jobs)} 条")
+        if on_done:
+            on_done()
+
+    thread = threading.Thread(target=worker, name='deferred-translation')
+    thread.start()
+    return thread
+
+
+def save_cache():
+    if _cache is not None:
+        _cache.save()
+
+
+def print_stats():
+    if _cache is not None and (_cache.hits or _cache.misses):
+        total = _cache.hits + _cache.misses
+        print(f"\n🌐 翻译缓存: 命中 {_cache.hits}/{total}（{_cache.hits * 100 // total}%），缓存 {len(_cache)} 条")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+链接规范化与条目 ID
+同一篇文章的不同链接（http/https、m./wap. 手机版、带追踪参数、带锚点）规范化成同一个地址，
+条目 ID 取规范化地址的哈希；缓存、去重、快照比对都以它为键
+"""
+
+import hashlib
+import urllib.parse
+
+# 手机版/通用前缀，去掉后与桌面版视为同一站点
+HOST_PREFIXES = ('www.', 'm.', 'wap.', 'mobile.', '3g.')
+# 只用于统计来源的参数，不影响文章内容
+TRACKING_PARAMS = {
+    'spm', 'from', 'ref', 'ref_src', 'share', 'share_token', 'fbclid', 'gclid', 'dclid', 'msclkid',
+    'yclid', 'igshid', 'mc_cid', 'mc_eid', 'cmpid', 'scm', 'wfr', 'isappinstalled', 'tt_from', 'ncid',
+    'guccounter',
+}
+TRACKING_PREFIXES = ('utm_', 'hmsr', 'hmpl', 'hmcu', 'hmkw', 'hmci', 'share_', 'at_')
+DEFAULT_PORTS = {'80', '443'}
+
+
+def _is_tracking(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url):
+    """
+    规范化链接：统一 https、主机名小写并去掉 www./m./wap. 前缀和默认端口，
+    去掉追踪参数和锚点，其余参数排序，路径去掉末尾斜杠；解析不了的原样返回（去空白）
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    if url.startswith('//'):
+        url = 'https:' + url
+    elif '://' not in url:
+        url = 'https://' + url
+    try:
+        parts = urllib.parse.urlsplit(url)
+        host = (parts.hostname or '').rstrip('.')
+        port = parts.port
+    except ValueError:
+        return url
+    if parts.scheme.lower() not in ('http', 'https') or not host:
+        return url
+
+    for prefix in HOST_PREFIXES:
+        # 只去一层，且至少留下 "xxx.yyy"
+        if host.startswith(prefix) and host.count('.') >= 2:
+            host = host[len(prefix):]
+            break
+    if port and str(port) not in DEFAULT_PORTS:
+        host = f"{host}:{port}"
+
+    path = urllib.parse.quote(urllib.parse.unquote(parts.path), safe="/%:@!$&'()*+,;=~")
+    while '//' in path:
+        path = path.replace('//', '/')
+    path = path.rstrip('/')
+
+    query = [(name, value) for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+             if not _is_tracking(name)]
+    query.sort()
+    return urllib.parse.urlunsplit(('https', host, path, urllib.parse.urlencode(query), ''))
+
+
+def item_id(link, title=''):
+    """
+    条目的稳定 ID（16 位十六进制）：有具体文章路径时取规范化链接的哈希；
+    没有链接或只是站点首页（多条手工条目共用一个首页链接）时退回用标题
+    """
+    canonical = canonical_url(link)
+    path = urllib.parse.urlsplit(canonical).path if canonical else ''
+    if path or (canonical and urllib.parse.urlsplit(canonical).query):
+        key = canonical
+    else:
+        key = f"title:{' '.join((title or '').split())}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def assign_ids(items):
+    """给还没有 id 的条目补上 id（原地修改），返回 items"""
+    for item in items:
+        if not item.get('id'):
+            item['id'] = item_id(item.get('link', ''), item.get('title', ''))
+    return items
+
+
+if __name__ == "__main__":
+    samples = [
+        "http://www.example.com/news/123.html?utm_source=rss&b=2&a=1#comments",
+        "https://m.example.com/news/123.html/?a=1&b=2&spm=abc",
+        "https://WAP.Example.com:443/news/123.html?b=2&a=1",
+        "https://www.jiading.gov.cn/",
+    ]
+    for sample in samples:
+        print(f"{item_id(sample, '标题')}  {canonical_url(sample)}")
@@ -1,16 +1,14 @@
 #!/bin/bash
-# 实时新闻抓取 - 每5分钟运行
+# 实时新闻抓取 - 常驻调度
+# 每个源按自己的更新频率轮询（1分钟 ~ 4小时自动调整），有新内容时才重新发布
 
 echo "🚀 启动实时新闻抓取服务..."
-echo "⏱️  更新频率: 每5分钟"
+echo "⏱️  更新频率: 按源自适应"
 echo "📱 推送: 突发新闻自动推送到 Telegram"
 echo ""
 
 cd "$(dirname "$0")"
 
-while true; do
-    python3 backend/fetch_news_realtime.py
-    echo ""
-    echo "😴 休眠5分钟... $(date '+%H:%M:%S')"
-    sleep 300
-done
+# 调度器默认延后翻译（先发布原文标题，翻译在后台完成后回填）
+# 只想跑一轮可以用: python3 backend/fetch_news_realtime.py --defer-translate
+exec python3 backend/scheduler.py
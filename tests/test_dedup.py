@@ -0,0 +1,68 @@
+"""
+dedup.py 的合并规则：只差一个关键字的标题不合并，同一来源只有 ID 相同才合并
+运行: python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+from dedup import THRESHOLD, dedup_items, features, find_clusters, jaccard
+
+
+def _item(title, source, link):
+    return {'title': title, 'source': source, 'link': link}
+
+
+def _titles(items):
+    return [item['title'] for item in items]
+
+
+OPPOSITE_PAIRS = [
+    ("Stocks rise as Fed holds rates steady", "Stocks fall as Fed holds rates steady"),
+    ("美股三大指数周一集体上涨", "美股三大指数周一集体下跌"),
+    ("上海今日起实施新版垃圾分类规定", "上海明日起实施新版垃圾分类规定"),
+]
+
+
+def test_opposite_titles_below_threshold():
+    for a, b in OPPOSITE_PAIRS:
+        assert jaccard(features(a), features(b)) < THRESHOLD, (a, b)
+
+
+def test_opposite_titles_from_different_sources_kept():
+    for a, b in OPPOSITE_PAIRS:
+        items = [_item(a, "新浪", "https://a.example.com/1"), _item(b, "网易", "https://b.example.com/2")]
+        assert _titles(dedup_items(items)) == [a, b]
+
+
+def test_reposts_from_different_sources_merged():
+    items = [
+        _item("上海发布新一轮住房公积金调整政策", "上海发布", "https://a.example.com/1"),
+        _item("🏠 【快讯】上海发布新一轮住房公积金调整政策 - 新华网", "新华网", "https://b.example.com/2"),
+    ]
+    unique = dedup_items(items)
+    assert len(unique) == 1
+    assert unique[0]['otherSources'] == [{'source': "新华网", 'link': "https://b.example.com/2"}]
+
+
+def test_same_source_similar_titles_kept():
+    items = [
+        _item("上海发布新一轮住房公积金调整政策", "上海发布", "https://a.example.com/1"),
+        _item("【快讯】上海发布新一轮住房公积金调整政策", "上海发布", "https://a.example.com/2"),
+    ]
+    assert len(dedup_items(items)) == 2
+
+
+def test_same_source_same_id_merged():
+    items = [
+        _item("上海发布新一轮住房公积金调整政策", "上海发布", "https://a.example.com/1?utm_source=rss"),
+        _item("上海发布新一轮住房公积金调整政策（附解读）", "上海发布", "https://a.example.com/1"),
+    ]
+    assert len(dedup_items(items)) == 1
+
+
+def test_find_clusters_sources_optional():
+    titles = ["上海发布新一轮住房公积金调整政策", "【快讯】上海发布新一轮住房公积金调整政策"]
+    assert find_clusters(titles) == [[0, 1]]
+    assert find_clusters(titles, sources=["源1", "源1"]) == [[0], [1]]
@@ -0,0 +1,32 @@
+"""
+item_store.py：一直出现、内容没变的条目也要刷新 last_seen，不能过了保留期被 prune 删掉
+运行: python -m pytest tests
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+import item_store
+from item_store import ItemStore
+
+
+def test_unchanged_item_survives_prune(tmp_path):
+    store = ItemStore(tmp_path / "items.db")
+    item = {"id": "a1", "source": "嘉定发布", "title": "嘉定新城建设提速"}
+    start = time.time()
+
+    # 40 天里每天都抓到同一条、内容不变
+    for day in range(40):
+        store.save([item], category="shanghai", now=start + day * 86400)
+
+    assert store.prune(now=start + 40 * 86400) == 0
+    key = item_store.key("嘉定发布", "a1")
+    assert key in store.get_many([key])
+
+
+def test_gone_item_is_pruned(tmp_path):
+    store = ItemStore(tmp_path / "items.db")
+    store.save([{"id": "a1", "source": "嘉定发布", "title": "嘉定新城建设提速"}], category="shanghai")
+    assert store.prune(now=time.time() + (item_store.RETENTION_DAYS + 1) * 86400) == 1
@@ -0,0 +1,36 @@
+"""
+image_handler.fetch_og_images：预算用完后在后台跑完的 og:image 也要写进缓存文件
+运行: python -m pytest tests
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+import image_handler
+
+
+def test_late_og_results_saved_after_budget(tmp_path, monkeypatch):
+    cache_file = tmp_path / "og_images.json"
+    monkeypatch.setattr(image_handler, "_og_cache", image_handler.OgImageCache(cache_file))
+
+    def slow_scan(url):
+        time.sleep(0.3)
+        return f"{url}/cover.jpg"
+
+    monkeypatch.setattr(image_handler, "_scan_og_image", slow_scan)
+    urls = [f"https://example.com/{n}" for n in range(3)]
+    results = image_handler.fetch_og_images(urls, budget=0.05)
+    assert results == {}
+    image_handler.save_og_cache()  # 主流程在预算用完后马上存盘，这时后台请求还没跑完
+    assert json.loads(cache_file.read_text(encoding='utf-8')) == {}
+
+    deadline = time.time() + 3
+    while time.time() < deadline:
+        saved = json.loads(cache_file.read_text(encoding='utf-8'))
+        if len(saved) == len(urls):
+            break
+        time.sleep(0.05)
+    assert sorted(image for image, _ in saved.values()) == [f"{url}/cover.jpg" for url in urls]
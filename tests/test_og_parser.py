@@ -0,0 +1,37 @@
+"""
+image_handler.OgImageParser：同一页面有多个图片 meta 时按 OG_META_KEYS 的优先级取，不按出现顺序
+运行: python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+from image_handler import OgImageParser
+
+
+def _parse(*chunks):
+    parser = OgImageParser()
+    for chunk in chunks:
+        if parser.feed_chunk(chunk):
+            break
+    return parser.image
+
+
+def test_og_image_beats_earlier_twitter_image():
+    html = ('<html><head><meta name="twitter:image" content="https://a.example.com/tw.jpg">'
+            '<meta property="og:image" content="https://a.example.com/og.jpg"></head><body>')
+    assert _parse(html) == "https://a.example.com/og.jpg"
+
+
+def test_twitter_image_used_when_no_og_image():
+    html = ('<html><head><meta name="twitter:image:src" content="https://a.example.com/src.jpg">'
+            '<meta name="twitter:image" content="https://a.example.com/tw.jpg"></head><body>')
+    assert _parse(html) == "https://a.example.com/tw.jpg"
+
+
+def test_stops_at_og_image_across_chunks():
+    parser = OgImageParser()
+    assert not parser.feed_chunk('<head><meta name="twitter:image" content="/tw.jpg">')
+    assert parser.feed_chunk('<meta property="og:image" content="/og.jpg"><meta name="x">')
+    assert parser.image == "/og.jpg"
@@ -0,0 +1,64 @@
+"""
+push_server.py：hello 事件带版本号作为 id，刚连上就断开的页面重连时能补发错过的版本
+运行: python -m pytest tests
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+import deltas
+from push_server import PushServer
+
+
+def _snapshot(*titles):
+    return {"shanghai": [{"id": title, "title": title} for title in titles]}
+
+
+async def _read_events(port, count, last_event_id=None):
+    """连上 /events，读 count 条事件（不含 retry），返回 [{id, event, data}]"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    head = "GET /events HTTP/1.1\r\nHost: localhost\r\n"
+    if last_event_id is not None:
+        head += f"Last-Event-ID: {last_event_id}\r\n"
+    writer.write((head + "\r\n").encode('ascii'))
+    await reader.readuntil(b"\r\n\r\n")
+    events = []
+    while len(events) < count:
+        block = (await asyncio.wait_for(reader.readuntil(b"\n\n"), 5)).decode('utf-8')
+        fields = dict(line.split(": ", 1) for line in block.strip().split("\n") if ": " in line)
+        if 'event' in fields:
+            events.append(fields)
+    writer.close()
+    return events
+
+
+def test_reconnect_right_after_hello_catches_up(tmp_path):
+    deltas.record(None, _snapshot("a"), tmp_path)
+    deltas.record(_snapshot("a"), _snapshot("a", "b"), tmp_path)
+
+    async def scenario():
+        push = PushServer(tmp_path)
+        server = await asyncio.start_server(push.handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            # 第一次连接只收到 hello 就断开
+            hello, = await _read_events(port, 1)
+            assert hello['event'] == 'hello'
+            assert hello['id'] == '2'
+
+            # 断开期间发布了新版本；浏览器重连时带上 hello 的 id
+            deltas.record(_snapshot("a", "b"), _snapshot("a", "b", "c"), tmp_path)
+            push.publish_new_versions()  # 监视协程看到新版本，但这个页面已经不在连接里
+            hello, catch_up = await _read_events(port, 2, last_event_id=hello['id'])
+            return hello, catch_up
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    hello, catch_up = asyncio.run(scenario())
+    assert hello['id'] == '2'  # 后面还有补发，先用页面自己的版本
+    assert catch_up['event'] == 'delta'
+    assert catch_up['id'] == '3'
+    assert '"c"' in catch_up['data']
@@ -0,0 +1,55 @@
+"""
+常驻调度器的每日维护：进程不退出，日期变了也要清理条目库、删过期的归档日文件、压实旧日文件
+运行: python -m pytest tests
+"""
+
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+import archive
+import item_store
+import scheduler
+
+
+def _at_noon(day):
+    return time.mktime(datetime(day.year, day.month, day.day, 12).timetuple())
+
+
+def test_long_running_loop_prunes_old_day_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "RETENTION_DAYS", 5)
+    monkeypatch.setattr(item_store, "_store", item_store.ItemStore(tmp_path / "items.db"))
+    start = date(2026, 1, 1)
+    maintained_day = None
+    calls = []
+    real_maintain = archive.maintain
+    monkeypatch.setattr(archive, "maintain", lambda *args: calls.append(args) or real_maintain(*args))
+
+    # 模拟连续跑 20 天、每天多轮抓取发布
+    for offset in range(20):
+        day = start + timedelta(days=offset)
+        for round_no in range(3):
+            item = {"id": f"{offset}-{round_no}", "title": f"第 {offset} 天第 {round_no} 轮"}
+            archive.get_archive(tmp_path).append({"shanghai": [item]}, now=_at_noon(day) + round_no)
+            maintained_day = scheduler.maintain_if_due(maintained_day, today=day, archive_dir=tmp_path)
+
+    assert len(calls) == 20  # 每天只维护一次
+    last_day = start + timedelta(days=19)
+    kept = sorted(path.stem for path in tmp_path.glob("????-??-??.db"))
+    assert kept == [(last_day - timedelta(days=n)).isoformat() for n in range(5, -1, -1)]  # 今天 + 前 5 天
+    assert archive.get_archive(tmp_path).stats()["days"] == 6
+
+
+def test_item_store_pruned_on_date_change(tmp_path, monkeypatch):
+    store = item_store.ItemStore(tmp_path / "items.db")
+    monkeypatch.setattr(item_store, "_store", store)
+    old = time.time() - (item_store.RETENTION_DAYS + 1) * 86400
+    store.save([{"id": "a1", "source": "嘉定发布", "title": "旧条目"}], category="shanghai", now=old)
+
+    day = scheduler.maintain_if_due(None, today=date(2026, 1, 1), archive_dir=tmp_path / "archive")
+    assert store.prune() == 0  # 已在维护里删掉
+    store.save([{"id": "a2", "source": "嘉定发布", "title": "又一条旧条目"}], category="shanghai", now=old)
+    scheduler.maintain_if_due(day, today=day, archive_dir=tmp_path / "archive")
+    assert store.prune() == 1  # 同一天不再重复维护
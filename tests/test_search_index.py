@@ -0,0 +1,36 @@
+"""
+search_index.py：进程内缓存的索引在文件被别的进程改写后要重新加载；同一条出现在两个分类里不算变化
+运行: python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+import search_index
+from search_index import SearchIndex
+
+
+def _snapshot(*titles, category="shanghai"):
+    return {category: [{"id": title, "title": title, "link": f"https://example.com/{title}"} for title in titles]}
+
+
+def test_cached_index_reloads_after_other_process_writes(tmp_path):
+    path = tmp_path / "search_index.json"
+    search_index.update(_snapshot("嘉定新城建设提速"), path)
+
+    # 另一个进程加载同一个文件、加了一条再写回
+    other = SearchIndex.load(path)
+    other.update(_snapshot("嘉定新城建设提速", "南翔镇加装电梯"))
+    other.save()
+
+    assert search_index.get_index(path).search("南翔")[1] == 1
+    assert search_index.update(_snapshot("嘉定新城建设提速", "南翔镇加装电梯"), path) == (0, 0)
+
+
+def test_item_in_two_categories_is_stable(tmp_path):
+    index = SearchIndex(tmp_path / "search_index.json")
+    data = dict(_snapshot("嘉定新城建设提速"), **_snapshot("嘉定新城建设提速", category="policy"))
+    assert index.update(data) == (2, 0)
+    assert index.update(data) == (0, 0)
+    assert index.search("嘉定", category="policy")[1] == 1